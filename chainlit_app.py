@@ -627,6 +627,10 @@ async def shutdown():
             logger.warning("Auth pool close timed out, terminated")
         _auth_pool = None
 
+    from src.clients.api_client import close_client
+
+    await close_client()
+
 
 # =============================================================================
 # MAIN
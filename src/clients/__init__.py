@@ -9,6 +9,7 @@ from .api_client import (
     check_api_health,
     check_database_health,
     check_llm_health,
+    close_client,
     upload_file,
 )
 
@@ -17,5 +18,6 @@ __all__ = [
     "check_api_health",
     "check_database_health",
     "check_llm_health",
+    "close_client",
     "upload_file",
 ]
@@ -32,6 +32,12 @@ API_TIMEOUT_DEFAULT = 30.0
 API_TIMEOUT_HEALTH = 5.0
 API_TIMEOUT_UPLOAD = 120.0
 
+# Connection pool shared by call_api and stream_from_api (keep-alive connections reused across requests)
+API_MAX_CONNECTIONS = 64
+API_MAX_KEEPALIVE_CONNECTIONS = 32
+
+_client: httpx.AsyncClient | None = None
+
 
 # =============================================================================
 # API CLIENT FUNCTIONS
@@ -67,29 +73,53 @@ async def call_api(
         httpx.HTTPError: For network/connection errors
     """
     url = f"{API_BASE_URL}{API_PREFIX}{endpoint}"
+    client = _get_client()
 
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        if method == "GET":
-            response = await client.get(url)
-        elif method == "POST":
-            response = await client.post(url, json=data)
-        elif method == "DELETE":
-            response = await client.delete(url)
-        else:
-            raise ValueError(f"Unsupported method: {method}")
-
-        # Handle error responses with user-friendly messages
-        if response.status_code >= 400:
-            try:
-                error_body = response.json()
-                detail = error_body.get("detail", "An error occurred")
-            except Exception:
-                detail = f"Request failed with status {response.status_code}"
+    if method == "GET":
+        response = await client.get(url, timeout=timeout)
+    elif method == "POST":
+        response = await client.post(url, json=data, timeout=timeout)
+    elif method == "DELETE":
+        response = await client.delete(url, timeout=timeout)
+    else:
+        raise ValueError(f"Unsupported method: {method}")
 
-            logger.warning(f"API error {response.status_code}: {detail}")
-            raise APIError(detail, response.status_code)
+    # Handle error responses with user-friendly messages
+    if response.status_code >= 400:
+        try:
+            error_body = response.json()
+            detail = error_body.get("detail", "An error occurred")
+        except Exception:
+            detail = f"Request failed with status {response.status_code}"
+
+        logger.warning(f"API error {response.status_code}: {detail}")
+        raise APIError(detail, response.status_code)
+
+    return response.json()
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Get the shared keep-alive client for call_api and stream_from_api, creating it on first use."""
+    global _client
+
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=API_TIMEOUT_DEFAULT,
+            limits=httpx.Limits(
+                max_connections=API_MAX_CONNECTIONS,
+                max_keepalive_connections=API_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared API client and its pooled connections (call on shutdown)."""
+    global _client
 
-        return response.json()
+    if _client is not None:
+        await _client.aclose()
+        _client = None
 
 
 async def check_api_health() -> tuple[bool, str]:
@@ -231,7 +261,7 @@ async def stream_from_api(endpoint: str, data: dict | None = None, timeout: floa
 
     url = f"{API_BASE_URL}{API_PREFIX}{endpoint}"
 
-    async with httpx.AsyncClient(timeout=timeout) as client, client.stream("POST", url, json=data) as response:
+    async with _get_client().stream("POST", url, json=data, timeout=timeout) as response:
         if response.status_code >= 400:
             try:
                 error_body = await response.aread()
@@ -99,10 +99,10 @@ class Settings(BaseSettings):
     llm_kb_model: str | None = None  # Model for KB/insight generation
     llm_kb_max_tokens: int = Field(default=1000, ge=50, le=8000, description="Max response tokens for insights")
     llm_kb_max_data_size: int = Field(
-        default=50000, ge=1000, le=500000, description="Max chars for previous query data in insights"
+        default=50000, ge=1000, le=500000, description="Max size (UTF-8 bytes) of previous query data in insights"
     )
     llm_kb_max_prompt_size: int = Field(
-        default=100000, ge=1000, le=500000, description="Total max prompt size (chars) for KB insights"
+        default=100000, ge=1000, le=500000, description="Total max prompt size (UTF-8 bytes) for KB insights and SQL summaries"
     )
     llm_kb_temperature: float | None = Field(
         default=0.3, ge=0.0, le=2.0, description="Temperature for KB insights (higher for more natural summaries)"
@@ -115,6 +115,12 @@ class Settings(BaseSettings):
     llm_sql_summary_max_rows: int = Field(
         default=50, ge=1, le=500, description="Max result rows sent to LLM for AI summary"
     )
+    llm_sql_summary_concurrency: int = Field(
+        default=8, ge=1, le=64, description="Max concurrent LLM calls when summarizing a batch of results"
+    )
+    llm_sql_summary_cache_size: int = Field(
+        default=256, ge=0, le=10000, description="Max AI summaries cached in memory for repeated queries (0 = off)"
+    )
 
     # Vanna RAG retrieval counts
     vanna_n_results_sql: int = Field(
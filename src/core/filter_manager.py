@@ -8,8 +8,10 @@ Designed for extensibility - can easily support multiple states/years in future.
 """
 
 import re
-from dataclasses import dataclass, field
+import time
+from dataclasses import dataclass, field, replace
 from datetime import UTC, datetime
+from functools import lru_cache
 from typing import Any
 
 from src.core.logging import get_logger
@@ -83,51 +85,80 @@ class DataFilter:
         Returns:
             List of SQL conditions (e.g., ["state_name = 'Connecticut'", "fiscal_year = 2023"])
         """
-        conditions = []
+        # Validated before the cache lookup: the cache key compares equal for 2023 and
+        # 2023.0 (typed=True only checks the tuple's type), so a hit must not skip validation
+        states = tuple(map(self._validate_state, self.states))
+        fiscal_years = tuple(map(self._validate_fiscal_year, self.fiscal_years))
+        return list(_sql_conditions(states, fiscal_years))
 
-        if self.states:
-            validated = [self._validate_state(s) for s in self.states]
-            if len(validated) == 1:
-                conditions.append(f"state_name = '{validated[0]}'")
-            else:
-                states_str = "', '".join(validated)
-                conditions.append(f"state_name IN ('{states_str}')")
+    def get_description(self) -> str:
+        """Get human-readable description of filter."""
+        return _filter_description(tuple(self.states), tuple(self.fiscal_years))
 
-        if self.fiscal_years:
-            validated_years = [self._validate_fiscal_year(y) for y in self.fiscal_years]
-            if len(validated_years) == 1:
-                conditions.append(f"fiscal_year = {validated_years[0]}")
-            else:
-                years_str = ", ".join(map(str, validated_years))
-                conditions.append(f"fiscal_year IN ({years_str})")
 
-        return conditions
+# DataFilter instances are rebuilt from the database on every get_filter() and stay mutable,
+# so the rendered conditions/description are memoized on the filter contents instead.
 
-    def get_description(self) -> str:
-        """Get human-readable description of filter."""
-        if self.is_empty:
-            return "No filter (All data)"
 
-        parts = []
-        if self.states:
-            if len(self.states) == 1:
-                parts.append(f"State: {self.states[0]}")
-            else:
-                parts.append(f"States: {', '.join(self.states)}")
+@lru_cache(maxsize=128)
+def _sql_conditions(states: tuple[str, ...], fiscal_years: tuple[int, ...]) -> tuple[str, ...]:
+    """Render the WHERE conditions for a filter's already validated states and fiscal years."""
+    conditions = []
+
+    if states:
+        if len(states) == 1:
+            conditions.append(f"state_name = '{states[0]}'")
+        else:
+            states_str = "', '".join(states)
+            conditions.append(f"state_name IN ('{states_str}')")
+
+    if fiscal_years:
+        if len(fiscal_years) == 1:
+            conditions.append(f"fiscal_year = {fiscal_years[0]}")
+        else:
+            years_str = ", ".join(map(str, fiscal_years))
+            conditions.append(f"fiscal_year IN ({years_str})")
+
+    return tuple(conditions)
+
 
-        if self.fiscal_years:
-            if len(self.fiscal_years) == 1:
-                parts.append(f"FY{self.fiscal_years[0]}")
-            else:
-                years = ", ".join(f"FY{y}" for y in self.fiscal_years)
-                parts.append(f"Years: {years}")
+@lru_cache(maxsize=128)
+def _filter_description(states: tuple[str, ...], fiscal_years: tuple[int, ...]) -> str:
+    """Render the human-readable description for a filter's states and fiscal years."""
+    if not (states or fiscal_years):
+        return "No filter (All data)"
 
-        return " | ".join(parts)
+    parts = []
+    if states:
+        if len(states) == 1:
+            parts.append(f"State: {states[0]}")
+        else:
+            parts.append(f"States: {', '.join(states)}")
+
+    if fiscal_years:
+        if len(fiscal_years) == 1:
+            parts.append(f"FY{fiscal_years[0]}")
+        else:
+            years = ", ".join(f"FY{y}" for y in fiscal_years)
+            parts.append(f"Years: {years}")
+
+    return " | ".join(parts)
 
 
 class FilterManager:
     """Simple per-user filter manager with database persistence."""
 
+    # How long the database fallback user ID is reused before it is looked up again
+    FALLBACK_USER_TTL_SECONDS = 60
+    # Bounds how long another worker's filter change can go unseen by this process
+    FILTER_CACHE_TTL_SECONDS = 30
+
+    def __init__(self):
+        # (user_id, monotonic expiry) from the last successful database fallback lookup
+        self._fallback_user: tuple[str, float] | None = None
+        # user_id -> (filter, monotonic expiry); kept current by _save_filter
+        self._filter_cache: dict[str, tuple[DataFilter, float]] = {}
+
     def _get_user_id(self) -> str:
         """
         Get current user ID from request context.
@@ -162,7 +193,12 @@ class FilterManager:
         except Exception:
             pass
 
-        # Fallback: use first user in database
+        # Fallback: use first user in database. Not tied to any request, so it is
+        # shared and reused for FALLBACK_USER_TTL_SECONDS instead of queried per call.
+        cached = self._fallback_user
+        if cached is not None and time.monotonic() < cached[1]:
+            return cached[0]
+
         try:
             from sqlalchemy import text
 
@@ -173,6 +209,7 @@ class FilterManager:
                 result = session.execute(text("SELECT identifier FROM users LIMIT 1"))
                 row = result.fetchone()
                 if row:
+                    self._fallback_user = (row[0], time.monotonic() + self.FALLBACK_USER_TTL_SECONDS)
                     return row[0]
             finally:
                 session.close()
@@ -181,14 +218,35 @@ class FilterManager:
 
         return "default"
 
+    @staticmethod
+    def _copy_filter(filter_obj: DataFilter) -> DataFilter:
+        """Copy a filter so callers can mutate it without touching the cached one."""
+        return replace(filter_obj, states=list(filter_obj.states), fiscal_years=list(filter_obj.fiscal_years))
+
+    def _cache_filter(self, user_id: str, filter_obj: DataFilter):
+        """Remember a user's filter for FILTER_CACHE_TTL_SECONDS."""
+        expires_at = time.monotonic() + self.FILTER_CACHE_TTL_SECONDS
+        self._filter_cache[user_id] = (self._copy_filter(filter_obj), expires_at)
+
+    def invalidate_filter_cache(self, user_id: str | None = None):
+        """Drop the cached filter for one user, or for every user when user_id is None."""
+        if user_id is None:
+            self._filter_cache.clear()
+        else:
+            self._filter_cache.pop(user_id, None)
+
     def get_filter(self) -> DataFilter:
-        """Get current filter from database."""
+        """Get current filter, from the per-user cache or else the database."""
+        user_id = self._get_user_id()
+        cached = self._filter_cache.get(user_id)
+        if cached is not None and time.monotonic() < cached[1]:
+            return self._copy_filter(cached[0])
+
         try:
             from sqlalchemy import text
 
             from src.database.engine import SessionLocal
 
-            user_id = self._get_user_id()
             session = SessionLocal()
             try:
                 result = session.execute(
@@ -198,21 +256,26 @@ class FilterManager:
             finally:
                 session.close()
 
+            filter_obj = DataFilter()
             if row and row[0]:
                 prefs = row[0]
-                return DataFilter(
+                filter_obj = DataFilter(
                     states=prefs.get("states", []),
                     fiscal_years=prefs.get("fiscal_years", []),
                     created_at=datetime.fromisoformat(prefs["created_at"]) if prefs.get("created_at") else None,
                     updated_at=datetime.fromisoformat(prefs["updated_at"]) if prefs.get("updated_at") else None,
                 )
+            self._cache_filter(user_id, filter_obj)
+            return filter_obj
         except Exception as e:
+            # Not cached, so the next call retries the database
             logger.error(f"Error loading filter: {e}")
 
         return DataFilter()
 
     def _save_filter(self, filter_obj: DataFilter):
-        """Save filter to database."""
+        """Save filter to database and refresh the user's cached filter."""
+        user_id = self._get_user_id()
         try:
             import json
             import uuid
@@ -221,7 +284,6 @@ class FilterManager:
 
             from src.database.engine import SessionLocal
 
-            user_id = self._get_user_id()
             prefs = {
                 "states": filter_obj.states,
                 "fiscal_years": filter_obj.fiscal_years,
@@ -243,7 +305,10 @@ class FilterManager:
                 session.commit()
             finally:
                 session.close()
+            self._cache_filter(user_id, filter_obj)
         except Exception as e:
+            # Stored state is unknown after a failed save, so reload it next time
+            self.invalidate_filter_cache(user_id)
             logger.error(f"Error saving filter: {e}", exc_info=True)
 
     def set_state(self, state: str) -> DataFilter:
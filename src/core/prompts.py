@@ -149,6 +149,57 @@ def build_kb_insight_prompt(
 # =============================================================================
 
 
+AI_SUMMARY_DATA_HEADER = "DATA TO ANALYZE:\n"
+AI_SUMMARY_CLOSING = "Provide your analysis:"
+
+
+def build_ai_summary_system_message(has_code_enrichment: bool = False, system_prompt_override: str = None) -> str:
+    """
+    Build the AI summary system message (analyst persona + instructions).
+
+    Args:
+        has_code_enrichment: Whether code lookups are included
+        system_prompt_override: Custom system prompt (from per-user prompt)
+
+    Returns:
+        System message
+    """
+    system_parts = [system_prompt_override or AI_SUMMARY_SYSTEM_PROMPT]
+
+    if has_code_enrichment:
+        system_parts.append(
+            "CRITICAL: Always use code descriptions (from CODE REFERENCE), never use numeric codes in your response!"
+        )
+
+    return "\n\n".join(system_parts)
+
+
+def build_ai_summary_user_parts(question: str, filters: str = None, sql: str = None) -> list[str]:
+    """
+    Build the AI summary user message sections that precede the data.
+
+    The full user message is these sections, then AI_SUMMARY_DATA_HEADER plus
+    the data, then AI_SUMMARY_CLOSING, joined by blank lines.
+
+    Args:
+        question: User's question
+        filters: Active filter description
+        sql: SQL query that produced the results
+
+    Returns:
+        List of user message sections
+    """
+    user_parts = [f'USER\'S QUESTION: "{question}"']
+
+    if filters:
+        user_parts.append(f"ACTIVE FILTERS: {filters}")
+
+    if sql:
+        user_parts.append(f"SQL QUERY:\n{sql}")
+
+    return user_parts
+
+
 # Helper function to build the complete prompt
 def build_ai_summary_prompt(
     question: str,
@@ -173,26 +224,12 @@ def build_ai_summary_prompt(
         Tuple of (system_message, user_message)
     """
     # System message: analyst persona + instructions
-    system_parts = [system_prompt_override or AI_SUMMARY_SYSTEM_PROMPT]
-
-    if has_code_enrichment:
-        system_parts.append(
-            "CRITICAL: Always use code descriptions (from CODE REFERENCE), never use numeric codes in your response!"
-        )
-
-    system_message = "\n\n".join(system_parts)
+    system_message = build_ai_summary_system_message(has_code_enrichment, system_prompt_override)
 
     # User message: question + filters + SQL + data
-    user_parts = [f'USER\'S QUESTION: "{question}"']
-
-    if filters:
-        user_parts.append(f"ACTIVE FILTERS: {filters}")
-
-    if sql:
-        user_parts.append(f"SQL QUERY:\n{sql}")
-
-    user_parts.append(f"DATA TO ANALYZE:\n{data_context}")
-    user_parts.append("Provide your analysis:")
+    user_parts = build_ai_summary_user_parts(question, filters, sql)
+    user_parts.append(f"{AI_SUMMARY_DATA_HEADER}{data_context}")
+    user_parts.append(AI_SUMMARY_CLOSING)
 
     user_message = "\n\n".join(user_parts)
 
@@ -20,6 +20,11 @@ from src.etl.writer import DatabaseWriter
 logger = get_logger(__name__)
 
 
+# Set once reference tables are confirmed populated. They are only emptied by the
+# init_database CLI (a separate process), so a positive result holds for this process.
+_REFERENCES_READY = False
+
+
 def check_references_ready() -> tuple[bool, list[str]]:
     """
     Check if reference tables are populated.
@@ -27,17 +32,34 @@ def check_references_ready() -> tuple[bool, list[str]]:
     CRITICAL: Main tables have FK constraints to reference tables.
     Loading data will fail if reference tables are empty.
 
+    A confirmed ready result is cached for the process; empty tables or a
+    failed check are re-checked on the next call.
+
     Returns:
         Tuple of (ready: bool, empty_tables: list[str])
     """
+    global _REFERENCES_READY
+
+    if _REFERENCES_READY:
+        return True, []
+
     try:
         from src.database.init_database import check_references_populated
 
-        return check_references_populated()
+        ready, empty_tables = check_references_populated()
     except Exception as e:
         logger.warning(f"Could not check reference tables: {e}")
         return True, []  # Assume OK if check fails
 
+    _REFERENCES_READY = ready
+    return ready, empty_tables
+
+
+def clear_references_cache() -> None:
+    """Forget a cached reference-tables-ready result (e.g. after the tables are reset)."""
+    global _REFERENCES_READY
+    _REFERENCES_READY = False
+
 
 class ETLStatus:
     """Track ETL job status"""
@@ -61,6 +61,9 @@ class CSVReader:
         try:
             logger.info(f"Reading CSV: {self.file_path.name} (skip={skip_rows}, n_rows={n_rows})")
 
+            # read_csv(n_rows=...) already stops decoding after n_rows. Schema inference
+            # still covers infer_schema_length rows, so a sampled read gets the same
+            # dtypes as a full read of the file.
             df = pl.read_csv(
                 self.file_path,
                 skip_rows=skip_rows,
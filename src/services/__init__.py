@@ -4,7 +4,13 @@ Services Package
 Business logic and domain services.
 """
 
-from .ai_summary import generate_ai_summary, generate_simple_summary
+from .ai_summary import (
+    clear_summary_cache,
+    generate_ai_summaries,
+    generate_ai_summary,
+    generate_simple_summary,
+    stream_ai_summary,
+)
 from .code_enrichment import (
     CODE_COLUMN_MAPPINGS,
     enrich_results_with_code_descriptions,
@@ -16,7 +22,10 @@ from .code_enrichment import (
 
 __all__ = [
     "generate_ai_summary",
+    "generate_ai_summaries",
     "generate_simple_summary",
+    "stream_ai_summary",
+    "clear_summary_cache",
     "CODE_COLUMN_MAPPINGS",
     "clear_code_cache",
     "enrich_results_with_code_descriptions",
@@ -8,20 +8,125 @@ Uses centralized templates from src/core/prompts.py.
 """
 
 import asyncio
-import json
+import bisect
+import hashlib
+import re
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from functools import lru_cache
+from operator import itemgetter
+from typing import NamedTuple
+
+import numpy as np
+import orjson
+import pandas as pd
 
 from ..core.config import settings
 from ..core.logging import get_logger
 from ..core.prompts import (
+    AI_SUMMARY_CLOSING,
+    AI_SUMMARY_DATA_HEADER,
     CODE_REFERENCE_FOOTER,
     CODE_REFERENCE_HEADER,
     SIMPLE_SUMMARY_TEMPLATES,
-    build_ai_summary_prompt,
+    build_ai_summary_system_message,
+    build_ai_summary_user_parts,
 )
 from .code_enrichment import enrich_results_with_code_descriptions  # noqa: F401 - re-exported via src.services
 
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; np.round is used without it
+    njit = None
+
 logger = get_logger(__name__)
 
+# Below this many rows the per-cell loop is faster than NumPy/pandas setup
+_VECTORIZE_MIN_ROWS = 64
+
+# Plain decimal / scientific notation numbers, e.g. "12", "-3.5", ".25", "1e6"
+_NUMERIC_STR_RE = re.compile(r"^\s*[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?\s*$")
+
+# Strings int() parses: optional sign, surrounding whitespace, digit groups with underscores
+_INT_STR_RE = re.compile(r"\s*[-+]?\d+(?:_\d+)*\s*")
+
+# Relative distance from a .5 tie within which scale-and-rint may disagree with round().
+# Far wider than float error (~1e-16), so every cell that could differ is redone.
+_TIE_TOLERANCE = 1e-9
+
+# Rough serialized size (bytes) of one result cell, for the pre-format prompt size estimate
+_EST_CHARS_PER_CELL = 32
+
+# Simple summary template by row count: up to 10 rows "few", up to 100 "medium", else "large".
+# Templates are bound to their str.format once here rather than looked up per call.
+_SIMPLE_SUMMARY_THRESHOLDS = (10, 100)
+_SIMPLE_SUMMARY_FORMATTERS = tuple(
+    SIMPLE_SUMMARY_TEMPLATES[key].format for key in ("few_results", "medium_results", "large_results")
+)
+_SINGLE_RESULT_FORMAT = SIMPLE_SUMMARY_TEMPLATES["single_result"].format
+_NO_RESULTS_FORMAT = SIMPLE_SUMMARY_TEMPLATES["no_results"].format
+
+# Magnitude suffixes for _compact_number, largest first
+_COMPACT_SUFFIXES = ((1e12, "T"), (1e9, "B"), (1e6, "M"))
+
+# Fixed user message segments, encoded once for _PromptBuilder
+_DATA_HEADER_BYTES = AI_SUMMARY_DATA_HEADER.encode()
+_CLOSING_BYTES = AI_SUMMARY_CLOSING.encode()
+
+# LLM summaries keyed by a hash of the exact prompt and LLM params (LRU order,
+# bounded by LLM_SQL_SUMMARY_CACHE_SIZE)
+_summary_cache: OrderedDict[str, str] = OrderedDict()
+
+# LLM calls currently running, by summary cache key
+_inflight_summaries: dict[str, asyncio.Future] = {}
+
+
+if njit is not None:
+
+    # nogil: the loop can run alongside other threads (e.g. an LLM call in to_thread).
+    # No fastmath or parallel: NULLs arrive as NaN, and arrays are at most a few
+    # hundred rows (truncated to max_rows), below where prange pays for its threads.
+    @njit(cache=True, nogil=True)
+    def _round_hundredths(values, rounded, suspect):
+        """Scale-and-rint each value to 2 decimals (compiled loop, no per-cell boxing)."""
+        for i in range(values.size):
+            scaled = values[i] * 100.0
+            nearest = np.rint(scaled)
+            rounded[i] = nearest / 100.0
+            # Negated so NaN/inf (all comparisons False) are flagged too
+            suspect[i] = not (abs(abs(scaled - nearest) - 0.5) > _TIE_TOLERANCE * max(1.0, abs(scaled)))
+
+else:
+
+    def _round_hundredths(values, rounded, suspect):
+        """Scale-and-rint each value to 2 decimals."""
+        with np.errstate(over="ignore", invalid="ignore"):
+            scaled = values * 100.0
+            nearest = np.rint(scaled)
+            np.divide(nearest, 100.0, out=rounded)
+            suspect[:] = ~(np.abs(np.abs(scaled - nearest) - 0.5) > _TIE_TOLERANCE * np.maximum(1.0, np.abs(scaled)))
+
+
+def _round_float_array(values: np.ndarray) -> np.ndarray:
+    """
+    Round a float64 array to 2 decimals, matching round(value, 2) cell for cell.
+
+    Scale-and-rint agrees with round() except where value * 100 lands within
+    rounding error of a .5 tie (2.675, -0.005) or is not finite (1e307 * 100
+    overflows, NaN). Those cells are redone with round().
+    """
+    rounded = np.empty_like(values)
+    suspect = np.empty(values.size, dtype=np.bool_)
+    _round_hundredths(values, rounded, suspect)
+    for i in np.flatnonzero(suspect).tolist():
+        rounded[i] = round(float(values[i]), 2)
+    return rounded
+
+
+if njit is not None:
+    # Compile now so the first query doesn't pay JIT latency
+    _round_float_array(np.zeros(1, dtype=np.float64))
+
 
 async def generate_ai_summary(
     question: str,
@@ -31,13 +136,16 @@ async def generate_ai_summary(
     filters: str = "",
     llm_params: dict | None = None,
     user_id: str | None = None,
+    use_cache: bool = True,
 ) -> str:
     """
     Generate AI summary of query results.
 
     When LLM_SQL_SUMMARY_ENABLED=true (default), sends the question, SQL, and
     a sample of results to the LLM for a natural language summary.
-    Falls back to simple templates when disabled, on error, or for empty results.
+    Falls back to simple templates when disabled, on error, or for empty and
+    single-value results. Successful LLM summaries are cached on the exact
+    prompt, so repeating a query doesn't call the LLM again.
 
     Args:
         question: User's SQL question
@@ -46,84 +154,319 @@ async def generate_ai_summary(
         row_count: Number of rows returned
         filters: Active filters description
         llm_params: Optional per-request LLM parameters (for context-window-aware sizing)
+        use_cache: Serve and store summaries in the in-memory summary cache
 
     Returns:
         AI-generated summary text or simple fallback
     """
+    # No rows or a single scalar: answer from the template before any prompt, cache, or LLM work
+    template_summary = _template_only_summary(question, results, row_count, filters)
+    if template_summary is not None:
+        return template_summary
+
     try:
-        if row_count == 0:
-            filter_text = f" (filtered by {filters})" if filters else ""
-            return SIMPLE_SUMMARY_TEMPLATES["no_results"].format(filter_text=filter_text)
-
-        # Check per-session override, fall back to server config
-        summary_enabled = (llm_params or {}).get("summary_enabled")
-        if summary_enabled is None:
-            summary_enabled = settings.llm_sql_summary_enabled
-        logger.debug(f"AI summary enabled={summary_enabled} (session={llm_params.get('summary_enabled') if llm_params else None}, config={settings.llm_sql_summary_enabled})")
-        if not summary_enabled:
-            return generate_simple_summary(question, row_count, results, filters)
-
-        # Determine how many rows to send based on context window budget
-        max_rows = (llm_params or {}).get("summary_max_rows") or settings.llm_sql_summary_max_rows
-        context_window = (llm_params or {}).get("context_window") or 0
-        if context_window and context_window > 0:
-            # Larger context = more rows. Reserve ~50% for results.
-            available_chars = int((context_window - 2000) * 4 * 0.5)  # 50% of input budget
-            # Estimate ~200 chars per row on average
-            max_rows = min(max_rows, max(10, available_chars // 200))
-
-        # Truncate results to budget
-        sample_results = _format_results_for_llm(results[:max_rows])
-        data_context = json.dumps(sample_results, default=str)
-
-        # Build the prompt (returns system, user tuple)
-        # Use per-user summary prompt if available
-        custom_system_prompt = None
-        if user_id:
-            try:
-                from src.database.prompt_manager import get_user_prompt
-
-                custom_system_prompt = get_user_prompt(user_id, "summary")
-            except Exception as e:
-                logger.warning(f"Failed to get custom summary prompt for {user_id}: {e}")
-
-        system_message, user_message = build_ai_summary_prompt(
-            question=question,
-            data_context=data_context,
-            filters=filters,
-            sql=sql,
-            system_prompt_override=custom_system_prompt,
-        )
+        prepared = _prepare_ai_summary(question, sql, results, row_count, filters, llm_params, user_id)
+        if isinstance(prepared, str):
+            return prepared
+
+        max_tokens = settings.effective_sql_max_tokens
+        cache_key = _summary_cache_key(prepared, max_tokens, llm_params) if use_cache else None
+        cached = _get_cached_summary(cache_key)
+        if cached is not None:
+            logger.info(f"AI summary served from cache ({len(cached)} chars)")
+            return cached + _truncation_note(row_count, prepared.max_rows)
+
+        if cache_key is None:
+            summary = await _call_summary_llm(prepared, max_tokens, llm_params)
+        else:
+            # Concurrent requests for the same prompt share one LLM call
+            inflight = _inflight_summaries.get(cache_key)
+            if inflight is None:
+                inflight = asyncio.ensure_future(_call_summary_llm(prepared, max_tokens, llm_params))
+                _inflight_summaries[cache_key] = inflight
+                inflight.add_done_callback(lambda _: _inflight_summaries.pop(cache_key, None))
+            # Shield so one caller being cancelled doesn't cancel the call for the others
+            summary = await asyncio.shield(inflight)
+
+        if summary is not None:
+            logger.info(f"AI summary generated ({len(summary)} chars, {prepared.max_rows} rows sent)")
+            _store_cached_summary(cache_key, summary)
+            return summary + _truncation_note(row_count, prepared.max_rows)
+
+        # LLM failed (logged by _call_summary_llm), fall back to simple
+        return generate_simple_summary(question, row_count, results, filters)
 
-        # Call LLM in a thread to avoid blocking
-        from .llm_service import get_llm_service
+    except Exception as e:
+        logger.error(f"AI summary error, falling back to template: {e}")
+        return generate_simple_summary(question, row_count, results, filters)
 
-        llm_service = get_llm_service()
 
-        summary = await asyncio.to_thread(
-            llm_service.generate_text,
-            user_message,
-            settings.effective_sql_max_tokens,
-            llm_params,
-            system_message,
-        )
+async def stream_ai_summary(
+    question: str,
+    sql: str,
+    results: list[dict],
+    row_count: int,
+    filters: str = "",
+    llm_params: dict | None = None,
+    user_id: str | None = None,
+    use_cache: bool = True,
+) -> AsyncIterator[str]:
+    """
+    Stream AI summary of query results as the LLM generates it.
 
-        if summary and not summary.startswith("**LLM Error**"):
-            truncation_note = ""
-            if row_count > max_rows:
-                truncation_note = f"\n\n*Summary based on {max_rows} of {row_count:,} rows.*"
-            logger.info(f"AI summary generated ({len(summary)} chars, {max_rows} rows sent)")
-            return summary + truncation_note
+    Same arguments and fallbacks as generate_ai_summary, but yields text chunks
+    so the caller can show the summary before the LLM finishes. Template
+    fallbacks and cached summaries are yielded as a single chunk. If the LLM
+    fails after some text was already yielded, the stream just ends.
 
-        # LLM failed, fall back to simple
-        error_detail = summary[:200] if summary else "No response"
-        logger.warning(f"AI summary LLM call failed, falling back to template: {error_detail}")
-        return generate_simple_summary(question, row_count, results, filters)
+    Yields:
+        Summary text chunks
+    """
+    template_summary = _template_only_summary(question, results, row_count, filters)
+    if template_summary is not None:
+        yield template_summary
+        return
 
+    try:
+        prepared = _prepare_ai_summary(question, sql, results, row_count, filters, llm_params, user_id)
     except Exception as e:
         logger.error(f"AI summary error, falling back to template: {e}")
+        prepared = generate_simple_summary(question, row_count, results, filters)
+
+    if isinstance(prepared, str):
+        yield prepared
+        return
+
+    max_tokens = settings.effective_sql_max_tokens
+    cache_key = _summary_cache_key(prepared, max_tokens, llm_params) if use_cache else None
+    cached = _get_cached_summary(cache_key)
+    if cached is not None:
+        yield cached + _truncation_note(row_count, prepared.max_rows)
+        return
+
+    from .llm_service import get_llm_service
+
+    streamed = 0
+    parts = []
+    try:
+        chunks = get_llm_service().generate_text_stream(
+            prepared.user_message, max_tokens, llm_params, prepared.system_message
+        )
+        # Pull each chunk in a thread; provider SDK streams are blocking iterators
+        while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+            streamed += len(chunk)
+            parts.append(chunk)
+            yield chunk
+    except Exception as e:
+        if streamed:
+            logger.error(f"AI summary stream interrupted after {streamed} chars: {e}")
+            return
+        logger.warning(f"AI summary LLM stream failed, falling back to template: {e}")
+
+    if not streamed:
+        yield generate_simple_summary(question, row_count, results, filters)
+        return
+
+    logger.info(f"AI summary streamed ({streamed} chars, {prepared.max_rows} rows sent)")
+    _store_cached_summary(cache_key, "".join(parts))
+    note = _truncation_note(row_count, prepared.max_rows)
+    if note:
+        yield note
+
+
+class _SummaryPrompt(NamedTuple):
+    """Prompt pair for an AI summary, plus how many result rows it includes."""
+
+    system_message: str
+    user_message: str
+    max_rows: int
+
+
+def _prepare_ai_summary(
+    question: str,
+    sql: str,
+    results: list[dict],
+    row_count: int,
+    filters: str,
+    llm_params: dict | None,
+    user_id: str | None,
+) -> _SummaryPrompt | str:
+    """
+    Build the AI summary prompt, or the template summary when the LLM isn't needed.
+
+    Callers answer empty and single-scalar results with _template_only_summary
+    before getting here.
+
+    Returns:
+        _SummaryPrompt to send to the LLM, or the final summary string for
+        disabled and over-budget results
+    """
+    # Check per-session override, fall back to server config
+    summary_enabled = (llm_params or {}).get("summary_enabled")
+    if summary_enabled is None:
+        summary_enabled = settings.llm_sql_summary_enabled
+    logger.debug(f"AI summary enabled={summary_enabled} (session={llm_params.get('summary_enabled') if llm_params else None}, config={settings.llm_sql_summary_enabled})")
+    if not summary_enabled:
+        return generate_simple_summary(question, row_count, results, filters)
+
+    # Determine how many rows to send based on context window budget
+    max_rows = (llm_params or {}).get("summary_max_rows") or settings.llm_sql_summary_max_rows
+    context_window = (llm_params or {}).get("context_window") or 0
+    if context_window and context_window > 0:
+        # Larger context = more rows. Reserve ~50% for results.
+        available_chars = int((context_window - 2000) * 4 * 0.5)  # 50% of input budget
+        # Estimate ~200 chars per row on average
+        max_rows = min(max_rows, max(10, available_chars // 200))
+
+    # Cheap size estimate (~32 bytes per cell) before formatting, so results
+    # that can't possibly fit skip the formatting and serialization work
+    max_prompt_size = settings.llm_kb_max_prompt_size
+    estimated_size = min(len(results), max_rows) * len(results[0]) * _EST_CHARS_PER_CELL
+    if estimated_size > max_prompt_size * 4:
+        logger.warning(f"AI summary skipped: ~{estimated_size:,} bytes of results exceeds prompt budget")
         return generate_simple_summary(question, row_count, results, filters)
 
+    # Truncate results to budget
+    sample_results = _format_results_for_llm(results, max_rows=max_rows, compact=True)
+
+    # Use per-user summary prompt if available
+    custom_system_prompt = None
+    if user_id:
+        try:
+            from src.database.prompt_manager import get_user_prompt
+
+            custom_system_prompt = get_user_prompt(user_id, "summary")
+        except Exception as e:
+            logger.warning(f"Failed to get custom summary prompt for {user_id}: {e}")
+
+    system_message = build_ai_summary_system_message(system_prompt_override=custom_system_prompt)
+
+    # Assemble the user message section by section; the serialized results
+    # stay as bytes until the single decode in build()
+    builder = _PromptBuilder()
+    for part in build_ai_summary_user_parts(question, filters, sql):
+        builder.append(part)
+    builder.append(_DATA_HEADER_BYTES)
+    builder.append(_dumps_for_llm(sample_results), new_section=False)
+    builder.append(_CLOSING_BYTES)
+    if builder.size > max_prompt_size:
+        logger.warning(f"AI summary skipped: {builder.size:,} byte prompt exceeds prompt budget")
+        return generate_simple_summary(question, row_count, results, filters)
+
+    return _SummaryPrompt(system_message, builder.build(), max_rows)
+
+
+def _template_only_summary(question: str, results: list[dict], row_count: int, filters: str) -> str | None:
+    """
+    Template summary for results the LLM has nothing to add to, else None.
+
+    Covers no rows, rows that weren't returned, and a single scalar answer
+    (COUNT, SUM, ...), which reads fine from the template.
+    """
+    if row_count == 0:
+        filter_text = f" (filtered by {filters})" if filters else ""
+        return _NO_RESULTS_FORMAT(filter_text=filter_text)
+    if not results or (row_count == 1 and isinstance(results[0], dict) and len(results[0]) == 1):
+        return generate_simple_summary(question, row_count, results, filters)
+    return None
+
+
+async def _call_summary_llm(prepared: _SummaryPrompt, max_tokens: int, llm_params: dict | None) -> str | None:
+    """
+    Call the LLM in a thread to avoid blocking the event loop.
+
+    Returns None when the LLM returned an error or placeholder text instead of a summary.
+    """
+    from .llm_service import get_llm_service, is_generated_text
+
+    llm_service = get_llm_service()
+
+    summary = await asyncio.to_thread(
+        llm_service.generate_text,
+        prepared.user_message,
+        max_tokens,
+        llm_params,
+        prepared.system_message,
+    )
+    if not is_generated_text(summary):
+        error_detail = summary[:200] if summary else "No response"
+        logger.warning(f"AI summary LLM call failed, falling back to template: {error_detail}")
+        return None
+    return summary
+
+
+def _summary_cache_key(prepared: _SummaryPrompt, max_tokens: int, llm_params: dict | None) -> str:
+    """Hash everything that determines the LLM's answer: both messages, token cap, and LLM params."""
+    payload = orjson.dumps(
+        [prepared.system_message, prepared.user_message, max_tokens, llm_params or {}],
+        default=str,
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _get_cached_summary(cache_key: str | None) -> str | None:
+    """Look up a cached summary, marking it most recently used."""
+    if cache_key is None or cache_key not in _summary_cache:
+        return None
+    _summary_cache.move_to_end(cache_key)
+    return _summary_cache[cache_key]
+
+
+def _store_cached_summary(cache_key: str | None, summary: str) -> None:
+    """Cache a summary, evicting the least recently used beyond LLM_SQL_SUMMARY_CACHE_SIZE."""
+    if cache_key is None or settings.llm_sql_summary_cache_size == 0:
+        return
+    _summary_cache[cache_key] = summary
+    _summary_cache.move_to_end(cache_key)
+    while len(_summary_cache) > settings.llm_sql_summary_cache_size:
+        _summary_cache.popitem(last=False)
+
+
+def clear_summary_cache() -> None:
+    """Clear the AI summary cache (useful for testing)."""
+    _summary_cache.clear()
+
+
+def _truncation_note(row_count: int, max_rows: int) -> str:
+    """Footnote telling the reader the summary only saw the first max_rows rows."""
+    if row_count > max_rows:
+        return f"\n\n*Summary based on {max_rows} of {row_count:,} rows.*"
+    return ""
+
+
+async def generate_ai_summaries(items: list[dict]) -> list[str]:
+    """
+    Generate AI summaries for several query results concurrently.
+
+    LLM calls overlap instead of running one after another, bounded by
+    LLM_SQL_SUMMARY_CONCURRENCY to stay within provider rate limits.
+
+    Args:
+        items: List of generate_ai_summary keyword arguments
+            (question, sql, results, row_count, and optionally filters, llm_params, user_id)
+
+    Returns:
+        Summaries in the same order as items
+    """
+    semaphore = asyncio.Semaphore(settings.llm_sql_summary_concurrency)
+
+    async def _bounded(item: dict) -> str:
+        async with semaphore:
+            return await generate_ai_summary(**item)
+
+    summaries = await asyncio.gather(*(_bounded(item) for item in items), return_exceptions=True)
+
+    output = []
+    for item, summary in zip(items, summaries, strict=True):
+        if isinstance(summary, BaseException):
+            logger.error(f"Batched AI summary error, falling back to template: {summary}")
+            summary = generate_simple_summary(
+                item["question"], item["row_count"], item["results"], item.get("filters", "")
+            )
+        output.append(summary)
+    return output
+
 
 def generate_simple_summary(question: str, row_count: int, results: list[dict], filters: str = "") -> str:
     """
@@ -141,80 +484,309 @@ def generate_simple_summary(question: str, row_count: int, results: list[dict],
         Simple summary string
     """
 
-    def format_number(value):
-        """Format number with commas for readability."""
-        try:
-            if isinstance(value, (int, float)):
-                return f"{value:,}"
-            return value
-        except (ValueError, TypeError):
-            return value
-
     filter_text = f" (filtered by {filters})" if filters else ""
 
-    if row_count == 1:
-        if results and len(results[0]) == 1:
-            value = list(results[0].values())[0]
-            formatted_value = format_number(value)
-            return SIMPLE_SUMMARY_TEMPLATES["single_result"].format(value=formatted_value, filter_text=filter_text)
-        return SIMPLE_SUMMARY_TEMPLATES["few_results"].format(count=format_number(1), filter_text=filter_text)
-    elif row_count <= 10:
-        return SIMPLE_SUMMARY_TEMPLATES["few_results"].format(count=format_number(row_count), filter_text=filter_text)
-    elif row_count <= 100:
-        return SIMPLE_SUMMARY_TEMPLATES["medium_results"].format(
-            count=format_number(row_count), filter_text=filter_text
-        )
-    else:
-        return SIMPLE_SUMMARY_TEMPLATES["large_results"].format(count=format_number(row_count), filter_text=filter_text)
+    if row_count == 1 and results and len(results[0]) == 1:
+        value = next(iter(results[0].values()))
+        return _SINGLE_RESULT_FORMAT(value=_format_number(value), filter_text=filter_text)
+
+    template_format = _SIMPLE_SUMMARY_FORMATTERS[bisect.bisect_left(_SIMPLE_SUMMARY_THRESHOLDS, row_count)]
+    return template_format(count=_format_number(row_count), filter_text=filter_text)
+
+
+def _format_number(value):
+    """Format number with commas for readability."""
+    try:
+        if isinstance(value, (int, float)):
+            return f"{value:,}"
+        return value
+    except (ValueError, TypeError):
+        return value
 
 
-def _format_results_for_llm(data: list[dict]) -> list[dict]:
+def _format_results_for_llm(data: list[dict], max_rows: int | None = None, compact: bool = False) -> list[dict]:
     """
     Format numeric values to 2 decimals to reduce tokens and improve readability.
+
+    Tabular results (every row a dict with the same keys) are formatted column
+    by column (see _format_results_columnar) and zipped back into rows once.
+    Ragged or malformed results use the generic per-cell loop.
+
+    Args:
+        data: Query result rows
+        max_rows: Only format this many rows (None = all). When rows are dropped,
+            a trailing {"_truncated": "N more rows omitted"} row tells the LLM so.
+        compact: Also shorten large floats for the prompt (see _compact_number)
     """
-    formatted = []
-    for row in data:
-        formatted_row = {}
-        for key, value in row.items():
-            try:
-                if isinstance(value, float):
-                    formatted_row[key] = round(value, 2)
-                elif isinstance(value, str):
-                    float_val = float(value)
-                    formatted_row[key] = round(float_val, 2)
-                else:
-                    formatted_row[key] = value
-            except (ValueError, TypeError):
-                formatted_row[key] = value
-        formatted.append(formatted_row)
+    omitted = 0
+    if max_rows is not None and len(data) > max_rows:
+        omitted = len(data) - max_rows
+        data = data[:max_rows]
+
+    if not data or not _is_tabular(data):
+        formatted = [{key: _format_value(value) for key, value in row.items()} for row in data]
+        if compact:
+            formatted = [{key: _compact_number(value) for key, value in row.items()} for row in formatted]
+    else:
+        columns = _format_results_columnar(data)
+        if compact:
+            columns = {key: [_compact_number(value) for value in values] for key, values in columns.items()}
+        formatted = [dict(zip(columns, values, strict=True)) for values in zip(*columns.values(), strict=True)]
+
+    if omitted:
+        formatted.append({"_truncated": f"{omitted:,} more rows omitted"})
     return formatted
 
 
-def _build_code_reference(code_enrichment: dict[str, dict[str, str]]) -> str:
+def _format_results_columnar(data: list[dict]) -> dict[str, list]:
+    """
+    Format tabular rows into {column: [values]} without building per-row dicts.
+
+    Large results go through NumPy/pandas per column; small ones through a
+    handler picked once per column from its first non-null value.
+    """
+    if len(data) < _VECTORIZE_MIN_ROWS:
+        return {key: [handler(row[key]) for row in data] for key, handler in _compile_column_handlers(data)}
+    return {key: _format_column(values) for key, values in _to_columnar(data).items()}
+
+
+def _compact_number(value):
+    """
+    Express a large float as a short magnitude string (123456789.12 -> "123.46M").
+
+    Only fractional floats of a million or more are compacted; every digit
+    costs prompt tokens and the summary only needs the magnitude. Ints and
+    whole-number floats (counts, years, numeric-string IDs) stay exact.
+    """
+    if type(value) is not float or abs(value) < 1e6 or value.is_integer():
+        return value
+    for threshold, suffix in _COMPACT_SUFFIXES:
+        if abs(value) >= threshold:
+            return f"{value / threshold:.2f}{suffix}"
+    return value
+
+
+def _dumps_for_llm(data) -> bytes:
+    """Serialize results to compact JSON for the prompt (orjson: one C pass, UTF-8 out)."""
+    return orjson.dumps(
+        data,
+        default=str,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+    )
+
+
+class _PromptBuilder:
+    """
+    Accumulates prompt sections as UTF-8 bytes with a running size.
+
+    Sections are separated by a blank line, matching build_ai_summary_prompt.
+    The size is known before the prompt is materialized, so an oversized
+    prompt is rejected without ever being joined into one string.
+    """
+
+    _SEPARATOR = b"\n\n"
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+        self.size = 0
+
+    def append(self, text: str | bytes, new_section: bool = True) -> None:
+        """Add text, as a new section or continuing the previous one."""
+        chunk = text.encode() if isinstance(text, str) else text
+        if new_section and self._parts:
+            self._parts.append(self._SEPARATOR)
+            self.size += len(self._SEPARATOR)
+        self._parts.append(chunk)
+        self.size += len(chunk)
+
+    def build(self) -> str:
+        """Join all sections into the final prompt."""
+        return b"".join(self._parts).decode()
+
+
+def _format_value(value):
+    """Round a single float or numeric string to 2 decimals; pass anything else through."""
+    formatter = _VALUE_FORMATTERS.get(type(value))
+    if formatter is not None:
+        return formatter(value)
+    # Subclasses (numpy.float64, str enums, ...) miss the exact-type table
+    if isinstance(value, float):
+        return round(value, 2)
+    if isinstance(value, str):
+        return _round_numeric_str(value)
+    return value
+
+
+def _round_float(value: float) -> float:
+    """Round a float to 2 decimals."""
+    return round(value, 2)
+
+
+def _round_numeric_str(value: str):
+    """Round a numeric string to 2 decimals; other strings pass through."""
+    # Regex check first: non-numeric strings never raise and unwind a ValueError
+    return round(float(value), 2) if _NUMERIC_STR_RE.match(value) else value
+
+
+def _passthrough(value):
+    """Return value unchanged."""
+    return value
+
+
+# Exact-type dispatch for _format_value: one dict lookup instead of an isinstance chain
+_VALUE_FORMATTERS = {
+    float: _round_float,
+    str: _round_numeric_str,
+    int: _passthrough,
+    type(None): _passthrough,
+}
+
+
+def _format_float_cell(value):
+    """Handler for float columns."""
+    if type(value) is float:
+        return round(value, 2)
+    return _format_value(value)
+
+
+def _format_str_cell(value):
+    """Handler for string columns: numeric strings become rounded floats."""
+    if type(value) is str:
+        return _round_numeric_str(value)
+    return _format_value(value)
+
+
+def _format_other_cell(value):
+    """Handler for columns that are never rounded (ints, dates, NULLs, ...)."""
+    if value is None or type(value) is int:
+        return value
+    return _format_value(value)
+
+
+def _compile_column_handlers(data: list[dict]) -> list[tuple]:
+    """
+    Pick one cell handler per column from its first non-null value.
+
+    SQL results share one type per column, so the type check runs once per
+    column instead of once per cell. Handlers still fall back to the generic
+    rules for cells that don't match.
+    """
+    schema = []
+    for key in data[0]:
+        sample = next((row[key] for row in data if row[key] is not None), None)
+        if isinstance(sample, float):
+            handler = _format_float_cell
+        elif isinstance(sample, str):
+            handler = _format_str_cell
+        else:
+            handler = _format_other_cell
+        schema.append((key, handler))
+    return schema
+
+
+def _is_tabular(data: list) -> bool:
+    """Check that every row is a dict with the same keys as the first row."""
+    if not isinstance(data[0], dict):
+        return False
+    keys = data[0].keys()
+    return all(isinstance(row, dict) and row.keys() == keys for row in data)
+
+
+def _to_columnar(rows: list[dict]) -> dict[str, list]:
+    """Transpose tabular rows into {column: values}, one list per column in row-key order."""
+    return {key: [row[key] for row in rows] for key in rows[0]} if rows else {}
+
+
+def _format_column(values: list) -> list:
+    """
+    Round one result column, vectorized when all non-null values are floats or all are strings.
+
+    NULLs (None) in an otherwise float or string column stay None.
+    """
+    value_types = {type(value) for value in values}
+    has_nulls = type(None) in value_types
+    value_types.discard(type(None))
+
+    if value_types == {float}:
+        # None becomes NaN in the array and is put back after rounding
+        rounded = _round_float_array(np.array(values, dtype=np.float64)).tolist()
+        if not has_nulls:
+            return rounded
+        return [None if value is None else r for value, r in zip(values, rounded, strict=True)]
+
+    if value_types == {str}:
+        series = pd.Series(values, dtype=object)
+        # Same numeric-string rule as the per-cell path, so "nan"/"inf" stay strings
+        is_numeric = series.str.match(_NUMERIC_STR_RE, na=False)
+        parsed = pd.to_numeric(series.where(is_numeric), errors="coerce").to_numpy(dtype=np.float64)
+        rounded = _round_float_array(parsed).tolist()
+        return [r if ok else v for v, r, ok in zip(values, rounded, is_numeric.tolist(), strict=True)]
+
+    return [_format_value(value) for value in values]
+
+
+def _build_code_reference(code_enrichment: dict[str, dict[str, str]], presorted: bool = False) -> str:
     """
     Build code reference section for LLM prompt.
 
-    Uses header/footer from src/core/prompts.py.
+    Uses header/footer from src/core/prompts.py. Output is cached on a frozen
+    copy of the enrichment, since the same code columns recur across queries.
+    The copy keeps column and code order, so codes that sort as equal (e.g.
+    "1" and "01") come out the same way in every process.
+
+    Args:
+        code_enrichment: {column: {code: description}} from enrich_results_with_code_descriptions
+        presorted: Codes are already in display order (e.g. loaded with ORDER BY code),
+            so keep dict order and skip the numeric sort
     """
     if not code_enrichment:
         return ""
 
-    code_reference = CODE_REFERENCE_HEADER
+    frozen = tuple((col_name, tuple(code_dict.items())) for col_name, code_dict in code_enrichment.items())
+    return _cached_code_reference(frozen, presorted)
+
+
+@lru_cache(maxsize=256)
+def _cached_code_reference(frozen_enrichment: tuple[tuple[str, tuple], ...], presorted: bool = False) -> str:
+    """Build the code reference text from a frozen enrichment signature."""
+    parts = [CODE_REFERENCE_HEADER]
+
+    for col_name, code_items in frozen_enrichment:
+        parts.append(f"\n{col_name.replace('_', ' ').title()}:\n")
+        ordered = code_items if presorted else _sort_code_items(code_items)
+        for code, description in ordered:
+            parts.append(f"  - Code {code}: {description}\n")
 
-    for col_name, code_dict in code_enrichment.items():
-        code_reference += f"\n{col_name.replace('_', ' ').title()}:\n"
+    parts.append(CODE_REFERENCE_FOOTER)
 
-        # Sort codes numerically
-        def numeric_sort_key(item):
-            code = item[0]
-            try:
-                return (0, int(code))
-            except (ValueError, TypeError):
-                return (1, code)
+    return "".join(parts)
 
-        for code, description in sorted(code_dict.items(), key=numeric_sort_key):
-            code_reference += f"  - Code {code}: {description}\n"
 
-    code_reference += CODE_REFERENCE_FOOTER
+def _sort_code_items(code_items) -> list[tuple]:
+    """
+    Order (code, description) items: numeric codes first in numeric order, then the rest by code.
+
+    Partitions once (each code parsed a single time) and sorts both halves on
+    a C-level itemgetter key instead of calling a Python key per item. String
+    codes are classified up front (str.isdecimal(), then _INT_STR_RE for
+    signed or padded ones), so non-numeric codes like "A" never raise and
+    unwind a ValueError.
+    """
+    numeric = []
+    other = []
+    for item in code_items:
+        code = item[0]
+        if type(code) is str:
+            if code.isdecimal() or _INT_STR_RE.fullmatch(code):
+                numeric.append((int(code), item))
+            else:
+                other.append(item)
+            continue
+        try:
+            numeric.append((int(code), item))
+        except (ValueError, TypeError):
+            other.append(item)
 
-    return code_reference
+    numeric.sort(key=itemgetter(0))
+    other.sort(key=itemgetter(0))
+    return [item for _, item in numeric] + other
@@ -19,6 +19,10 @@ logger = get_logger(__name__)
 # =============================================================================
 
 
+# Code column mappings per dataset name (static per dataset, so computed once)
+_CODE_COLUMN_MAPPINGS_CACHE: dict[str, dict[str, str]] = {}
+
+
 def _get_code_column_mappings() -> dict[str, str]:
     """Get code column mappings from the active dataset configuration."""
     try:
@@ -26,7 +30,10 @@ def _get_code_column_mappings() -> dict[str, str]:
 
         ds = get_active_dataset()
         if ds:
-            return ds.get_code_column_mappings()
+            mappings = _CODE_COLUMN_MAPPINGS_CACHE.get(ds.name)
+            if mappings is None:
+                mappings = _CODE_COLUMN_MAPPINGS_CACHE[ds.name] = ds.get_code_column_mappings()
+            return mappings
     except Exception:
         pass
     return {}
@@ -41,17 +48,31 @@ CODE_COLUMN_MAPPINGS = _get_code_column_mappings()
 
 _CODE_LOOKUPS_CACHE = None
 
+# Lookup table entries that describe the table itself rather than a code
+_LOOKUP_METADATA_KEYS = frozenset({"description", "source_field"})
+
 
-def load_code_lookups() -> dict:
+def load_code_lookups(path: Path | None = None) -> dict:
     """
     Load code lookups from data_mapping.json.
     Cached after first load for performance.
 
+    Args:
+        path: Read this data_mapping.json instead of the active dataset's.
+            Explicit paths are read every call and never cached.
+
     Returns:
         Dictionary of all code lookups
     """
     global _CODE_LOOKUPS_CACHE
 
+    if path is not None:
+        try:
+            return _read_code_lookups_file(path)
+        except Exception as e:
+            logger.error(f"Error loading code lookups from {path}: {e}")
+            return {}
+
     if _CODE_LOOKUPS_CACHE is not None:
         return _CODE_LOOKUPS_CACHE
 
@@ -77,11 +98,9 @@ def load_code_lookups() -> dict:
 
         for data_mapping_path in possible_paths:
             if data_mapping_path.exists():
-                with open(data_mapping_path) as f:
-                    data = json.load(f)
-                    _CODE_LOOKUPS_CACHE = data.get("code_lookups", {})
-                    logger.info(f"Loaded {len(_CODE_LOOKUPS_CACHE)} code lookup tables from {data_mapping_path}")
-                    return _CODE_LOOKUPS_CACHE
+                _CODE_LOOKUPS_CACHE = _read_code_lookups_file(data_mapping_path)
+                logger.info(f"Loaded {len(_CODE_LOOKUPS_CACHE)} code lookup tables from {data_mapping_path}")
+                return _CODE_LOOKUPS_CACHE
 
         logger.warning("data_mapping.json not found")
         return {}
@@ -91,6 +110,12 @@ def load_code_lookups() -> dict:
         return {}
 
 
+def _read_code_lookups_file(path: Path) -> dict:
+    """Read the code_lookups section of a data_mapping.json file."""
+    with open(path) as f:
+        return json.load(f).get("code_lookups", {})
+
+
 def enrich_results_with_code_descriptions(results: list[dict]) -> dict[str, dict[str, str]]:
     """
     Find code columns in results and load their descriptions.
@@ -111,13 +136,12 @@ def enrich_results_with_code_descriptions(results: list[dict]) -> dict[str, dict
     if not results:
         return {}
 
-    # Detect code columns in results
+    # Detect code columns in results (key-view intersection, no set copy of the row)
     code_column_mappings = _get_code_column_mappings()
-    column_names = set(results[0].keys())
-    code_columns = column_names & code_column_mappings.keys()
+    code_columns = results[0].keys() & code_column_mappings.keys()
 
     if not code_columns:
-        return {}  # No code columns found
+        return {}  # No code columns found - skip loading lookups entirely
 
     logger.info(f"Detected code columns in results: {code_columns}")
 
@@ -129,11 +153,7 @@ def enrich_results_with_code_descriptions(results: list[dict]) -> dict[str, dict
         lookup_key = code_column_mappings[col_name]
 
         # Extract unique codes from results (convert to string for lookup)
-        unique_codes = set()
-        for row in results:
-            code_value = row.get(col_name)
-            if code_value is not None:
-                unique_codes.add(str(code_value))
+        unique_codes = {str(code_value) for row in results if (code_value := row.get(col_name)) is not None}
 
         if not unique_codes:
             continue
@@ -141,13 +161,13 @@ def enrich_results_with_code_descriptions(results: list[dict]) -> dict[str, dict
         # Load ONLY those codes that appear in results
         lookup_table = code_lookups.get(lookup_key, {})
 
-        enriched[col_name] = {}
-        for code in unique_codes:
-            # Get description, skip metadata fields
-            if code in lookup_table and code not in ["description", "source_field"]:
-                enriched[col_name][code] = lookup_table[code]
-            else:
-                enriched[col_name][code] = f"Unknown code {code}"
+        # Get description, skip metadata fields
+        enriched[col_name] = {
+            code: lookup_table[code]
+            if code in lookup_table and code not in _LOOKUP_METADATA_KEYS
+            else f"Unknown code {code}"
+            for code in unique_codes
+        }
 
         logger.info(f"Enriched {col_name}: {len(enriched[col_name])} codes mapped")
 
@@ -155,6 +175,7 @@ def enrich_results_with_code_descriptions(results: list[dict]) -> dict[str, dict
 
 
 def clear_cache():
-    """Clear the code lookups cache (useful for testing)."""
+    """Clear the code lookups and code column mapping caches (useful for testing)."""
     global _CODE_LOOKUPS_CACHE
     _CODE_LOOKUPS_CACHE = None
+    _CODE_COLUMN_MAPPINGS_CACHE.clear()
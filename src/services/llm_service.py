@@ -10,6 +10,7 @@ from __future__ import annotations
 import asyncio
 import os
 import threading
+from collections.abc import Iterator
 
 # Configure ONNX Runtime before any Vanna/ChromaDB imports
 # CRITICAL: Explicitly set thread count to prevent CPU affinity errors in LXC containers
@@ -31,6 +32,11 @@ _anthropic_client = None
 _azure_openai_client = None
 _ollama_client = None
 
+# Text _generate_text returns in place of a generated response
+NO_RESPONSE_TEXT = "No response generated."
+UNSUPPORTED_PROVIDER_TEXT = "Text generation not available for this provider."
+LLM_ERROR_PREFIX = "**LLM Error**"
+
 
 def _get_openai_client():
     global _openai_client
@@ -176,6 +182,21 @@ def _build_messages(prompt: str, system_prompt: str | None = None) -> list[dict]
     return messages
 
 
+def _resolve_text_params(max_tokens: int, llm_params: dict | None) -> tuple:
+    """Apply per-request overrides: (model, temperature, max_tokens, top_p)."""
+    effective_model = llm_params.get("model") if llm_params and llm_params.get("model") else settings.kb_model
+    effective_temperature = (
+        llm_params.get("temperature")
+        if llm_params and llm_params.get("temperature") is not None
+        else settings.effective_kb_temperature
+    )
+    effective_max_tokens = (
+        llm_params.get("max_tokens") if llm_params and llm_params.get("max_tokens") is not None else max_tokens
+    )
+    effective_top_p = llm_params.get("top_p") if llm_params and llm_params.get("top_p") is not None else None
+    return effective_model, effective_temperature, effective_max_tokens, effective_top_p
+
+
 def _generate_text(
     prompt: str, max_tokens: int = 500, llm_params: dict | None = None, system_prompt: str | None = None
 ) -> str:
@@ -189,18 +210,9 @@ def _generate_text(
         system_prompt: Optional system message (sent as system role for better LLM attention)
     """
     provider = settings.llm_provider
-
-    # Apply per-request overrides
-    effective_model = llm_params.get("model") if llm_params and llm_params.get("model") else settings.kb_model
-    effective_temperature = (
-        llm_params.get("temperature")
-        if llm_params and llm_params.get("temperature") is not None
-        else settings.effective_kb_temperature
-    )
-    effective_max_tokens = (
-        llm_params.get("max_tokens") if llm_params and llm_params.get("max_tokens") is not None else max_tokens
+    effective_model, effective_temperature, effective_max_tokens, effective_top_p = _resolve_text_params(
+        max_tokens, llm_params
     )
-    effective_top_p = llm_params.get("top_p") if llm_params and llm_params.get("top_p") is not None else None
 
     messages = _build_messages(prompt, system_prompt)
 
@@ -218,7 +230,7 @@ def _generate_text(
                 kwargs["top_p"] = effective_top_p
             response = client.chat.completions.create(**kwargs)
             if not response.choices:
-                return "No response generated."
+                return NO_RESPONSE_TEXT
             return response.choices[0].message.content.strip()
 
         elif provider == "anthropic":
@@ -237,7 +249,7 @@ def _generate_text(
                 api_kwargs["top_p"] = effective_top_p
             response = client.messages.create(**api_kwargs)
             if not response.content:
-                return "No response generated."
+                return NO_RESPONSE_TEXT
             return response.content[0].text.strip()
 
         elif provider == "ollama":
@@ -255,15 +267,91 @@ def _generate_text(
                 options=options,
             )
             if not response.get("message") or not response["message"].get("content"):
-                return "No response generated."
+                return NO_RESPONSE_TEXT
             return response["message"]["content"].strip()
 
         else:
-            return "Text generation not available for this provider."
+            return UNSUPPORTED_PROVIDER_TEXT
 
     except Exception as e:
         logger.error(f"Text generation failed: {e}")
-        return f"**LLM Error**: {str(e)}"
+        return f"{LLM_ERROR_PREFIX}: {str(e)}"
+
+
+def is_generated_text(text: str | None) -> bool:
+    """True when text is an actual LLM response, not empty, an error, or a placeholder."""
+    return (
+        bool(text)
+        and text not in (NO_RESPONSE_TEXT, UNSUPPORTED_PROVIDER_TEXT)
+        and not text.startswith(LLM_ERROR_PREFIX)
+    )
+
+
+def _generate_text_stream(
+    prompt: str, max_tokens: int = 500, llm_params: dict | None = None, system_prompt: str | None = None
+) -> Iterator[str]:
+    """
+    Generate text using direct LLM API, yielding chunks as the provider streams them.
+
+    Same parameters as _generate_text. Providers without streaming support yield
+    the full response as a single chunk. Errors are raised, not returned as text,
+    so callers can fall back before anything was shown.
+    """
+    provider = settings.llm_provider
+    effective_model, effective_temperature, effective_max_tokens, effective_top_p = _resolve_text_params(
+        max_tokens, llm_params
+    )
+
+    messages = _build_messages(prompt, system_prompt)
+
+    if provider in ("openai", "azure_openai"):
+        client = _get_azure_openai_client() if provider == "azure_openai" else _get_openai_client()
+        kwargs = {
+            "model": effective_model,
+            "max_tokens": effective_max_tokens,
+            "messages": messages,
+            "stream": True,
+        }
+        if effective_temperature is not None:
+            kwargs["temperature"] = effective_temperature
+        if effective_top_p is not None:
+            kwargs["top_p"] = effective_top_p
+        for chunk in client.chat.completions.create(**kwargs):
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    elif provider == "anthropic":
+        client = _get_anthropic_client()
+        api_kwargs = {
+            "model": effective_model,
+            "max_tokens": effective_max_tokens,
+            "messages": [m for m in messages if m["role"] != "system"],
+        }
+        if effective_temperature is not None:
+            api_kwargs["temperature"] = effective_temperature
+        if system_prompt:
+            api_kwargs["system"] = system_prompt
+        if effective_top_p is not None:
+            api_kwargs["top_p"] = effective_top_p
+        with client.messages.stream(**api_kwargs) as stream:
+            yield from stream.text_stream
+
+    elif provider == "ollama":
+        client = _get_ollama_client()
+        options = {
+            "num_predict": effective_max_tokens,
+        }
+        if effective_temperature is not None:
+            options["temperature"] = effective_temperature
+        if effective_top_p is not None:
+            options["top_p"] = effective_top_p
+        for chunk in client.chat(model=effective_model, messages=messages, options=options, stream=True):
+            content = (chunk.get("message") or {}).get("content")
+            if content:
+                yield content
+
+    else:
+        raise ValueError(f"{UNSUPPORTED_PROVIDER_TEXT} ({provider})")
 
 
 class LLMService:
@@ -310,6 +398,12 @@ class LLMService:
         """Generate text with optional system prompt."""
         return _generate_text(prompt, max_tokens, llm_params, system_prompt)
 
+    def generate_text_stream(
+        self, prompt: str, max_tokens: int = 500, llm_params: dict | None = None, system_prompt: str | None = None
+    ) -> Iterator[str]:
+        """Generate text with optional system prompt, yielding chunks as they arrive."""
+        return _generate_text_stream(prompt, max_tokens, llm_params, system_prompt)
+
     def get_provider_info(self) -> dict:
         """Get service info."""
         return {
@@ -130,6 +130,11 @@ HOUSEHOLD_LEVEL_VARIABLES: dict[str, str] = {
     "FYWGT": "fiscal_year_weight",
 }
 
+# Source variable names per level, frozen for membership checks
+PERSON_LEVEL_VARIABLES_KEYS: frozenset[str] = frozenset(PERSON_LEVEL_VARIABLES)
+ERROR_LEVEL_VARIABLES_KEYS: frozenset[str] = frozenset(ERROR_LEVEL_VARIABLES)
+HOUSEHOLD_LEVEL_VARIABLES_KEYS: frozenset[str] = frozenset(HOUSEHOLD_LEVEL_VARIABLES)
+
 
 def get_person_column_name(base_variable: str, member_number: int) -> str:
     """
@@ -0,0 +1,101 @@
+"""
+Integration test configuration - one PostgreSQL database per pytest-xdist worker
+
+Running ``pytest -n auto tests/integration`` gives every xdist worker its own
+database cloned from a template, so the ``CASE%``/``API%`` cleanup in one worker
+can't block on or wipe rows another worker is asserting against.
+
+The template defaults to ``snap_template`` (override with TEST_DATABASE_TEMPLATE).
+Create it once from an initialized database with reference tables populated:
+
+    CREATE DATABASE snap_template TEMPLATE snapanalyst_test_db;
+
+Without xdist (PYTEST_XDIST_WORKER unset) the configured DATABASE_URL is used as-is.
+
+Throwaway tmpfs cluster (local dev):
+    Set TEST_POSTGRES_TMPFS=1 (requires pytest-postgresql and local Postgres
+    binaries) to start a disposable cluster with fsync, synchronous_commit and
+    full_page_writes off, sockets in /dev/shm/pg. Add --basetemp=/dev/shm/pytest
+    to keep its data directory on tmpfs too. The schema and reference tables are
+    created fresh, so no template is needed. Never used against DATABASE_URL.
+"""
+
+import os
+from collections.abc import Generator
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+from src.core.config import settings
+
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+TEMPLATE_DATABASE = os.environ.get("TEST_DATABASE_TEMPLATE", "snap_template")
+TMPFS_CLUSTER = os.environ.get("TEST_POSTGRES_TMPFS") == "1"
+
+BASE_DATABASE_URL = make_url(str(settings.database_url))
+
+if TMPFS_CLUSTER:
+    from pytest_postgresql import factories
+
+    # Each xdist worker gets its own cluster on its own port (gw0 -> base, gw1 -> base + 1, ...)
+    TMPFS_PORT = int(os.environ.get("TEST_POSTGRES_PORT", "5433")) + int((XDIST_WORKER or "gw0").lstrip("gw"))
+    BASE_DATABASE_URL = BASE_DATABASE_URL.set(host="127.0.0.1", port=TMPFS_PORT)
+
+    postgresql_proc = factories.postgresql_proc(
+        host="127.0.0.1",
+        port=TMPFS_PORT,
+        user=BASE_DATABASE_URL.username,
+        password=BASE_DATABASE_URL.password,
+        unixsocketdir="/dev/shm/pg",
+        postgres_options="-c fsync=off -c synchronous_commit=off -c full_page_writes=off",
+    )
+
+WORKER_DATABASE_URL = (
+    BASE_DATABASE_URL.set(database=f"{BASE_DATABASE_URL.database}_{XDIST_WORKER}")
+    if XDIST_WORKER
+    else BASE_DATABASE_URL
+)
+
+# Point settings at the worker database before any test module imports
+# src.database.engine, so SessionLocal and the API routers bind to it too.
+settings.database_url = WORKER_DATABASE_URL.render_as_string(hide_password=False)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def worker_database(request: pytest.FixtureRequest) -> Generator[str, None, None]:
+    """Create this worker's database and drop it at session end."""
+    database_url = WORKER_DATABASE_URL.render_as_string(hide_password=False)
+    if not (XDIST_WORKER or TMPFS_CLUSTER):
+        yield database_url
+        return
+
+    if TMPFS_CLUSTER:
+        request.getfixturevalue("postgresql_proc")
+
+    database_name = WORKER_DATABASE_URL.database
+    template_clause = "" if TMPFS_CLUSTER else f' TEMPLATE "{TEMPLATE_DATABASE}"'
+    admin_engine = create_engine(BASE_DATABASE_URL.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    with admin_engine.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{database_name}" WITH (FORCE)'))
+        conn.execute(text(f'CREATE DATABASE "{database_name}"{template_clause}'))
+
+    if TMPFS_CLUSTER:
+        from src.database.init_database import initialize_database
+
+        initialize_database()
+
+    yield database_url
+
+    from src.database.engine import dispose_engines
+
+    dispose_engines()
+    with admin_engine.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{database_name}" WITH (FORCE)'))
+    admin_engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def test_database_url(worker_database: str) -> str:
+    """Database URL for this worker"""
+    return worker_database
@@ -21,14 +21,14 @@ from src.database.models import Base, Household
 
 
 @pytest.fixture(scope="module")
-def test_engine():
+def test_engine(test_database_url):
     """
     Create test database engine.
 
     Uses pre-existing database with reference tables. Don't drop tables
     as they have dependent views and are shared across test modules.
     """
-    engine = create_engine(str(settings.database_url))
+    engine = create_engine(str(test_database_url))
     Base.metadata.create_all(engine)
     yield engine
     # Don't drop tables - they have dependent views
@@ -9,11 +9,10 @@ from pathlib import Path
 
 import polars as pl
 import pytest
-from sqlalchemy import create_engine, text
+from sqlalchemy import String, any_, bindparam, create_engine, text
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Session
 
-from src.core.config import settings
-
 # Import reference models to ensure they're registered with Base.metadata
 from src.database import reference_models  # noqa: F401
 from src.database.engine import SessionLocal
@@ -25,10 +24,14 @@ from src.etl.validator import DataValidator
 from src.etl.writer import DatabaseWriter
 
 
-@pytest.fixture(scope="module")
-def test_database_url():
-    """Database URL for testing"""
-    return settings.database_url
+def case_id_in(column, case_ids):
+    """
+    Match a case_id column against a list bound as one ARRAY parameter.
+
+    Unlike ``column.in_(...)``, the SQL text stays ``= ANY(%(param)s)`` whatever
+    the list length, so Postgres can reuse the cached plan across assertions.
+    """
+    return column == any_(bindparam(None, list(case_ids), type_=ARRAY(String)))
 
 
 @pytest.fixture(scope="module")
@@ -79,7 +82,18 @@ def test_session(test_engine):
     connection.close()
 
 
-@pytest.fixture
+def _decimals(*values: str) -> list[Decimal]:
+    return [Decimal(v) for v in values]
+
+
+# Numeric columns are built as Polars Decimal with the model's precision/scale,
+# so the writer's Decimal fast path applies instead of a float -> str -> Decimal
+# conversion per row. Frames are immutable, so they're built once per module.
+MONEY = pl.Decimal(12, 2)
+WEIGHT = pl.Decimal(18, 8)
+
+
+@pytest.fixture(scope="module")
 def sample_households_df():
     """Create sample household data"""
     return pl.DataFrame(
@@ -88,18 +102,25 @@ def sample_households_df():
             "state_code": ["CA", "TX", "NY"],
             "state_name": ["California", "Texas", "New York"],
             "year_month": ["202310", "202310", "202310"],
-            "snap_benefit": [500.00, 750.50, 1200.00],
-            "gross_income": [2000.00, 3000.00, 1500.00],
-            "net_income": [1500.00, 2500.00, 1200.00],
+            "snap_benefit": _decimals("500.00", "750.50", "1200.00"),
+            "gross_income": _decimals("2000.00", "3000.00", "1500.00"),
+            "net_income": _decimals("1500.00", "2500.00", "1200.00"),
             "certified_household_size": [2, 3, 4],
             "snap_unit_size": [2, 3, 4],
-            "household_weight": [1.5, 1.8, 2.1],
-            "fiscal_year_weight": [1.0, 1.0, 1.0],
-        }
+            "household_weight": _decimals("1.5", "1.8", "2.1"),
+            "fiscal_year_weight": _decimals("1.0", "1.0", "1.0"),
+        },
+        schema_overrides={
+            "snap_benefit": MONEY,
+            "gross_income": MONEY,
+            "net_income": MONEY,
+            "household_weight": WEIGHT,
+            "fiscal_year_weight": WEIGHT,
+        },
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_members_df():
     """Create sample member data"""
     return pl.DataFrame(
@@ -109,14 +130,15 @@ def sample_members_df():
             "age": [35, 8, 42, 16, 12, 28],
             "sex": [2, 1, 1, 2, 1, 2],
             "snap_affiliation_code": [1, 1, 1, 1, 1, 1],
-            "wages": [1500.00, 0.00, 2000.00, 500.00, 0.00, 1200.00],
-            "social_security": [0.00, 0.00, 0.00, 0.00, 0.00, 0.00],
-            "ssi": [0.00, 0.00, 0.00, 0.00, 0.00, 0.00],
-        }
+            "wages": _decimals("1500.00", "0.00", "2000.00", "500.00", "0.00", "1200.00"),
+            "social_security": _decimals(*["0.00"] * 6),
+            "ssi": _decimals(*["0.00"] * 6),
+        },
+        schema_overrides={"wages": MONEY, "social_security": MONEY, "ssi": MONEY},
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_errors_df():
     """Create sample QC error data with valid codes from data_mapping.json"""
     return pl.DataFrame(
@@ -125,9 +147,10 @@ def sample_errors_df():
             "error_number": [1, 1],
             "element_code": [111, 130],  # Valid: Student status, Citizenship status
             "nature_code": [6, 7],  # Valid: Eligible person excluded, Ineligible person included
-            "error_amount": [50.00, 100.00],
+            "error_amount": _decimals("50.00", "100.00"),
             "responsible_agency": [1, 1],
-        }
+        },
+        schema_overrides={"error_amount": MONEY},
     )
 
 
@@ -159,7 +182,7 @@ class TestDatabaseWriter:
 
         # Query database - filter by test case_ids to avoid counting data from other tests
         households = (
-            test_session.query(Household).filter(Household.case_id.in_(["CASE001", "CASE002", "CASE003"])).all()
+            test_session.query(Household).filter(case_id_in(Household.case_id, ["CASE001", "CASE002", "CASE003"])).all()
         )
         assert len(households) == 3
 
@@ -186,7 +209,7 @@ class TestDatabaseWriter:
         # Query database - filter by test case_ids
         members = (
             test_session.query(HouseholdMember)
-            .filter(HouseholdMember.case_id.in_(["CASE001", "CASE002", "CASE003"]))
+            .filter(case_id_in(HouseholdMember.case_id, ["CASE001", "CASE002", "CASE003"]))
             .all()
         )
         assert len(members) == 6
@@ -219,7 +242,7 @@ class TestDatabaseWriter:
         assert errors_written == 2
 
         # Query database - filter by test case_ids
-        errors = test_session.query(QCError).filter(QCError.case_id.in_(["CASE002", "CASE003"])).all()
+        errors = test_session.query(QCError).filter(case_id_in(QCError.case_id, ["CASE002", "CASE003"])).all()
         assert len(errors) == 2
 
         # Check specific error
@@ -243,9 +266,11 @@ class TestDatabaseWriter:
 
         # Verify in database - filter by test case_ids
         test_case_ids = ["CASE001", "CASE002", "CASE003"]
-        assert test_session.query(Household).filter(Household.case_id.in_(test_case_ids)).count() == 3
-        assert test_session.query(HouseholdMember).filter(HouseholdMember.case_id.in_(test_case_ids)).count() == 6
-        assert test_session.query(QCError).filter(QCError.case_id.in_(test_case_ids)).count() == 2
+        assert test_session.query(Household).filter(case_id_in(Household.case_id, test_case_ids)).count() == 3
+        assert (
+            test_session.query(HouseholdMember).filter(case_id_in(HouseholdMember.case_id, test_case_ids)).count() == 6
+        )
+        assert test_session.query(QCError).filter(case_id_in(QCError.case_id, test_case_ids)).count() == 2
 
     def test_foreign_key_relationships(self, test_session, sample_households_df, sample_members_df):
         """Test that foreign key relationships work correctly"""
@@ -277,8 +302,10 @@ class TestDatabaseWriter:
         test_case_ids = ["CASE001", "CASE002", "CASE003"]
 
         # Verify data exists (filter by test case_ids)
-        assert test_session.query(Household).filter(Household.case_id.in_(test_case_ids)).count() == 3
-        assert test_session.query(HouseholdMember).filter(HouseholdMember.case_id.in_(test_case_ids)).count() == 6
+        assert test_session.query(Household).filter(case_id_in(Household.case_id, test_case_ids)).count() == 3
+        assert (
+            test_session.query(HouseholdMember).filter(case_id_in(HouseholdMember.case_id, test_case_ids)).count() == 6
+        )
 
         # Delete one household
         household = test_session.query(Household).filter(Household.case_id == "CASE001").first()
@@ -286,9 +313,9 @@ class TestDatabaseWriter:
         test_session.commit()
 
         # Verify cascade delete worked (filter by test case_ids)
-        assert test_session.query(Household).filter(Household.case_id.in_(test_case_ids)).count() == 2
+        assert test_session.query(Household).filter(case_id_in(Household.case_id, test_case_ids)).count() == 2
         assert (
-            test_session.query(HouseholdMember).filter(HouseholdMember.case_id.in_(test_case_ids)).count() == 4
+            test_session.query(HouseholdMember).filter(case_id_in(HouseholdMember.case_id, test_case_ids)).count() == 4
         )  # 2 members deleted
 
 
@@ -6,6 +6,8 @@ from pathlib import Path
 
 import pytest
 
+from src.utils.column_mapping import get_all_error_columns, get_all_person_columns
+
 # Test data directory
 TEST_DATA_DIR = Path(__file__).parent.parent / "data"
 
@@ -23,3 +25,28 @@ def test_csv_path() -> Path:
 def fiscal_year() -> int:
     """Default fiscal year for testing"""
     return 2023
+
+
+# get_all_*_columns are pure over the column_mapping constants, so build them once per session
+@pytest.fixture(scope="session")
+def all_person_columns():
+    """get_all_person_columns() result shared across the session"""
+    return get_all_person_columns()
+
+
+@pytest.fixture(scope="session")
+def all_person_columns_set(all_person_columns):
+    """all_person_columns as a frozenset for membership checks"""
+    return frozenset(all_person_columns)
+
+
+@pytest.fixture(scope="session")
+def all_error_columns():
+    """get_all_error_columns() result shared across the session"""
+    return get_all_error_columns()
+
+
+@pytest.fixture(scope="session")
+def all_error_columns_set(all_error_columns):
+    """all_error_columns as a frozenset for membership checks"""
+    return frozenset(all_error_columns)
@@ -4,22 +4,52 @@ Unit tests for AI Summary Service
 Tests AI-powered summary generation with dynamic prompt sizing.
 """
 
-from unittest.mock import patch
-
+import asyncio
+import json
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+from unittest.mock import Mock, patch
+
+import numpy as np
 import pytest
 
+import src.services.ai_summary as ai_summary
+from src.core.config import settings
+from src.core.prompts import SIMPLE_SUMMARY_TEMPLATES, build_ai_summary_prompt
 from src.services.ai_summary import (
     _build_code_reference,
+    _cached_code_reference,
+    _compact_number,
+    _compile_column_handlers,
+    _dumps_for_llm,
+    _format_results_columnar,
     _format_results_for_llm,
+    _format_value,
+    _PromptBuilder,
+    _sort_code_items,
+    _to_columnar,
+    clear_summary_cache,
+    generate_ai_summaries,
     generate_ai_summary,
     generate_simple_summary,
+    stream_ai_summary,
 )
+from src.services.llm_service import NO_RESPONSE_TEXT, UNSUPPORTED_PROVIDER_TEXT, _generate_text_stream
+
+
+@pytest.fixture(autouse=True)
+def _clear_summary_cache():
+    """Keep cached LLM summaries from leaking between tests"""
+    clear_summary_cache()
+    yield
+    clear_summary_cache()
 
 
 class TestGenerateAISummary:
     """Test main AI summary generation function"""
 
-    @pytest.mark.asyncio
     async def test_empty_results(self):
         """Test handling of empty results"""
         summary = await generate_ai_summary(
@@ -28,7 +58,16 @@ class TestGenerateAISummary:
 
         assert "no results" in summary.lower() or "no matching" in summary.lower() or "0 rows" in summary.lower()
 
-    @pytest.mark.asyncio
+    @patch("src.services.ai_summary._prepare_ai_summary")
+    async def test_empty_results_skip_prompt_preparation(self, mock_prepare):
+        """Test zero rows return the no-results template without building a prompt"""
+        summary = await generate_ai_summary(
+            question="Test question", sql="SELECT * FROM test", results=[], row_count=0, filters="FY2023"
+        )
+
+        assert summary == SIMPLE_SUMMARY_TEMPLATES["no_results"].format(filter_text=" (filtered by FY2023)")
+        mock_prepare.assert_not_called()
+
     async def test_single_value_result(self):
         """Test special handling for single-row single-column results"""
         results = [{"count": 1234}]
@@ -45,7 +84,6 @@ class TestGenerateAISummary:
         assert isinstance(summary, str)
         assert len(summary) > 0
 
-    @pytest.mark.asyncio
     async def test_single_value_with_filters(self):
         """Test single-value result includes filter information"""
         results = [{"total": 5000}]
@@ -61,7 +99,18 @@ class TestGenerateAISummary:
         assert "5,000" in summary
         assert "California" in summary or "filtered" in summary.lower()
 
-    @pytest.mark.asyncio
+    @patch("src.services.ai_summary._prepare_ai_summary")
+    @patch("src.services.llm_service.get_llm_service")
+    async def test_single_value_skips_llm(self, mock_get_service, mock_prepare):
+        """Test single-value results return the template without preparing a prompt or calling the LLM"""
+        summary = await generate_ai_summary(
+            question="How many households?", sql="SELECT COUNT(*)", results=[{"count": 1234}], row_count=1
+        )
+
+        assert summary == "The answer is **1,234**."
+        mock_prepare.assert_not_called()
+        mock_get_service.assert_not_called()
+
     async def test_ai_summary_success(self):
         """Test successful AI summary generation with template-based approach"""
         results = [{"state": "California", "count": 100}, {"state": "Texas", "count": 90}]
@@ -79,7 +128,6 @@ class TestGenerateAISummary:
         assert "2" in summary
         assert "records" in summary.lower() or "results" in summary.lower()
 
-    @pytest.mark.asyncio
     async def test_large_result_set(self):
         """Test simple summary for large result sets"""
         # Create large result set
@@ -93,7 +141,26 @@ class TestGenerateAISummary:
         assert isinstance(summary, str)
         assert "1,000" in summary
 
-    @pytest.mark.asyncio
+    @patch("src.services.llm_service.get_llm_service")
+    async def test_large_result_set_formats_only_sample(self, mock_get_service):
+        """Test only the first max_rows rows of a large result are formatted and sent"""
+        mock_llm = Mock()
+        mock_llm.generate_text.return_value = "Summary"
+        mock_get_service.return_value = mock_llm
+        results = [{"col1": i, "col2": f"value_{i}"} for i in range(1000)]
+
+        with patch("src.services.ai_summary._compile_column_handlers", wraps=_compile_column_handlers) as spy:
+            summary = await generate_ai_summary(
+                question="Show me data", sql="SELECT * FROM large_table", results=results, row_count=1000
+            )
+
+        assert len(spy.call_args.args[0]) == settings.llm_sql_summary_max_rows
+        user_message = mock_llm.generate_text.call_args.args[0]
+        assert '"value_49"' in user_message
+        assert '"value_50"' not in user_message
+        assert "950 more rows omitted" in user_message
+        assert summary.endswith(f"*Summary based on {settings.llm_sql_summary_max_rows} of 1,000 rows.*")
+
     async def test_single_row_multiple_columns(self):
         """Test simple summary for single row with multiple columns"""
         results = [{"state": "California", "count": 100}]
@@ -107,7 +174,6 @@ class TestGenerateAISummary:
         assert "1" in summary
         assert len(summary) > 0
 
-    @pytest.mark.asyncio
     async def test_single_value_number_formatting(self):
         """Test that single numeric values are formatted with commas"""
         results = [{"count": 50}]
@@ -120,7 +186,6 @@ class TestGenerateAISummary:
         assert isinstance(summary, str)
         assert "50" in summary
 
-    @pytest.mark.asyncio
     async def test_few_results(self):
         """Test summary generation for small result sets"""
         results = [{"element_code": 311, "count": 50}, {"element_code": 333, "count": 30}]
@@ -138,7 +203,6 @@ class TestGenerateAISummary:
         assert "2" in summary
         assert "records" in summary.lower() or "results" in summary.lower()
 
-    @pytest.mark.asyncio
     async def test_few_results_with_multiple_columns(self):
         """Test template-based summary for small result sets"""
         # Use 5 rows with multiple columns
@@ -159,10 +223,329 @@ class TestGenerateAISummary:
         assert "5" in summary
         assert "records" in summary.lower() or "results" in summary.lower()
 
+    @patch("src.services.ai_summary._format_results_for_llm")
+    async def test_prompt_too_large_fallback(self, mock_format):
+        """Test oversized results fall back to the simple summary without being formatted"""
+        results = [{"col1": i, "col2": f"value_{i}"} for i in range(1000)]
+
+        with patch.object(settings, "llm_kb_max_prompt_size", 100):
+            summary = await generate_ai_summary(
+                question="Show me data", sql="SELECT * FROM large_table", results=results, row_count=1000
+            )
+
+        mock_format.assert_not_called()
+        assert "1,000" in summary
+
+    @patch("src.services.llm_service.get_llm_service")
+    async def test_prompt_over_budget_after_formatting(self, mock_get_service):
+        """Test the precise post-format size check also falls back before calling the LLM"""
+        results = [{"note": "x" * 500}, {"note": "y" * 500}]
+
+        with patch.object(settings, "llm_kb_max_prompt_size", 200):
+            summary = await generate_ai_summary(question="Notes", sql="SELECT note", results=results, row_count=2)
+
+        mock_get_service.assert_not_called()
+        assert "2" in summary
+
+    @patch("src.services.llm_service.get_llm_service")
+    async def test_prompt_budget_counts_utf8_bytes(self, mock_get_service):
+        """Test multi-byte text is measured in bytes, not characters, against the prompt budget"""
+        results = [{"note": "é" * 400}, {"note": "ü" * 400}]
+
+        # ~900 characters of prompt, but ~1,700 UTF-8 bytes
+        with patch.object(settings, "llm_kb_max_prompt_size", 1200):
+            summary = await generate_ai_summary(question="Notes", sql="SELECT note", results=results, row_count=2)
+
+        mock_get_service.assert_not_called()
+        assert "2" in summary
+
+    @patch("src.services.llm_service.get_llm_service")
+    async def test_max_tokens_for_small_results(self, mock_get_service):
+        """Test small results get the full SQL token budget, so reasoning models aren't cut short"""
+        mock_llm = Mock()
+        mock_llm.generate_text.return_value = "Summary"
+        mock_get_service.return_value = mock_llm
+        results = [{"state": "CA", "count": 10}, {"state": "TX", "count": 8}]
+
+        with patch.object(settings, "llm_sql_max_tokens", 2000):
+            await generate_ai_summary(question="Counts", sql="SELECT state, count", results=results, row_count=2)
+
+        assert mock_llm.generate_text.call_args.args[1] == 2000
+
+
+class TestSummaryCache:
+    """Test caching of LLM summaries"""
+
+    RESULTS = [{"state": "California", "count": 100}, {"state": "Texas", "count": 90}]
+
+    @staticmethod
+    def _mock_llm(mock_get_service) -> Mock:
+        mock_llm = Mock()
+        mock_llm.generate_text.return_value = "California leads."
+        mock_get_service.return_value = mock_llm
+        return mock_llm
+
+    @patch("src.services.llm_service.get_llm_service")
+    async def test_repeat_query_served_from_cache(self, mock_get_service):
+        """Test an identical query reuses the summary instead of calling the LLM again"""
+        mock_llm = self._mock_llm(mock_get_service)
+
+        first = await generate_ai_summary(question="Top states", sql="SELECT ...", results=self.RESULTS, row_count=2)
+        second = await generate_ai_summary(question="Top states", sql="SELECT ...", results=self.RESULTS, row_count=2)
+
+        assert first == second == "California leads."
+        assert mock_llm.generate_text.call_count == 1
+
+    @patch("src.services.llm_service.get_llm_service")
+    async def test_different_results_miss_cache(self, mock_get_service):
+        """Test changed results or LLM params produce a new summary"""
+        mock_llm = self._mock_llm(mock_get_service)
+        changed = [{"state": "California", "count": 101}, {"state": "Texas", "count": 90}]
+
+        await generate_ai_summary(question="Top states", sql="SELECT ...", results=self.RESULTS, row_count=2)
+        await generate_ai_summary(question="Top states", sql="SELECT ...", results=changed, row_count=2)
+        await generate_ai_summary(
+            question="Top states", sql="SELECT ...", results=self.RESULTS, row_count=2, llm_params={"model": "other"}
+        )
+
+        assert mock_llm.generate_text.call_count == 3
+
+    @patch("src.services.llm_service.get_llm_service")
+    async def test_concurrent_identical_queries_share_one_call(self, mock_get_service):
+        """Test identical summaries requested at the same time make a single LLM call"""
+        mock_llm = Mock()
+
+        def slow_generate(*args):
+            time.sleep(0.05)
+            return "California leads."
+
+        mock_llm.generate_text.side_effect = slow_generate
+        mock_get_service.return_value = mock_llm
+
+        summaries = await asyncio.gather(
+            *(
+                generate_ai_summary(question="Top states", sql="SELECT ...", results=self.RESULTS, row_count=2)
+                for _ in range(5)
+            )
+        )
+
+        assert summaries == ["California leads."] * 5
+        assert mock_llm.generate_text.call_count == 1
+
+    @patch("src.services.llm_service.get_llm_service")
+    async def test_use_cache_false(self, mock_get_service):
+        """Test use_cache=False always calls the LLM"""
+        mock_llm = self._mock_llm(mock_get_service)
+
+        for _ in range(2):
+            await generate_ai_summary(
+                question="Top states", sql="SELECT ...", results=self.RESULTS, row_count=2, use_cache=False
+            )
+
+        assert mock_llm.generate_text.call_count == 2
+
+    @patch("src.services.llm_service.get_llm_service")
+    async def test_llm_errors_not_cached(self, mock_get_service):
+        """Test failed LLM calls are retried on the next request"""
+        mock_llm = self._mock_llm(mock_get_service)
+        mock_llm.generate_text.side_effect = ["**LLM Error**: timeout", "California leads."]
+
+        await generate_ai_summary(question="Top states", sql="SELECT ...", results=self.RESULTS, row_count=2)
+        summary = await generate_ai_summary(question="Top states", sql="SELECT ...", results=self.RESULTS, row_count=2)
+
+        assert summary == "California leads."
+
+    @pytest.mark.parametrize("placeholder", [NO_RESPONSE_TEXT, UNSUPPORTED_PROVIDER_TEXT, ""])
+    @patch("src.services.llm_service.get_llm_service")
+    async def test_placeholder_responses_fall_back_uncached(self, mock_get_service, placeholder):
+        """Test placeholder LLM text is replaced by the template summary and never cached"""
+        mock_llm = self._mock_llm(mock_get_service)
+        mock_llm.generate_text.side_effect = [placeholder, "California leads."]
+
+        fallback = await generate_ai_summary(question="Top states", sql="SELECT ...", results=self.RESULTS, row_count=2)
+        summary = await generate_ai_summary(question="Top states", sql="SELECT ...", results=self.RESULTS, row_count=2)
+
+        assert fallback == generate_simple_summary("Top states", 2, self.RESULTS, "")
+        assert summary == "California leads."
+        assert mock_llm.generate_text.call_count == 2
+
+    @patch("src.services.llm_service.get_llm_service")
+    async def test_cache_size_bound(self, mock_get_service):
+        """Test the least recently used summary is evicted past LLM_SQL_SUMMARY_CACHE_SIZE"""
+        mock_llm = self._mock_llm(mock_get_service)
+
+        with patch.object(settings, "llm_sql_summary_cache_size", 1):
+            for question in ("First", "Second", "First"):
+                await generate_ai_summary(question=question, sql="SELECT ...", results=self.RESULTS, row_count=2)
+
+        assert mock_llm.generate_text.call_count == 3
+
+
+class TestGenerateAISummaries:
+    """Test batched AI summary generation"""
+
+    @staticmethod
+    def _items(count: int) -> list[dict]:
+        return [
+            {
+                "question": f"Question {i}",
+                "sql": "SELECT state, count FROM data",
+                "results": [{"state": "CA", "count": i}, {"state": "TX", "count": i + 1}],
+                "row_count": 2,
+            }
+            for i in range(count)
+        ]
+
+    @patch("src.services.llm_service.get_llm_service")
+    async def test_batch_parallel_calls(self, mock_get_service):
+        """Test that batched LLM calls overlap instead of running serially"""
+        # Every call waits until all of them are in flight; serial calls would break the barrier
+        barrier = threading.Barrier(3, timeout=5)
+
+        def overlapping_generate_text(*args):
+            barrier.wait()
+            return "AI summary"
+
+        mock_get_service.return_value = Mock(generate_text=Mock(side_effect=overlapping_generate_text))
+
+        with patch.object(settings, "llm_sql_summary_concurrency", 3):
+            summaries = await generate_ai_summaries(self._items(3))
+
+        assert len(summaries) == 3
+        assert all(summary.startswith("AI summary") for summary in summaries)
+        assert not barrier.broken
+
+    @patch("src.services.ai_summary.generate_ai_summary")
+    async def test_batch_preserves_order_and_falls_back(self, mock_generate):
+        """Test results keep input order and failures fall back to the simple summary"""
+
+        async def fake_generate(**item):
+            if item["question"] == "Question 1":
+                raise RuntimeError("boom")
+            return item["question"]
+
+        mock_generate.side_effect = fake_generate
+
+        summaries = await generate_ai_summaries(self._items(3))
+
+        assert summaries[0] == "Question 0"
+        assert "2" in summaries[1]
+        assert summaries[2] == "Question 2"
+
+    async def test_empty_batch(self):
+        """Test empty batch returns empty list"""
+        assert await generate_ai_summaries([]) == []
+
+
+class TestStreamAISummary:
+    """Test streamed AI summary generation"""
+
+    RESULTS = [{"state": "California", "count": 100}, {"state": "Texas", "count": 90}]
+
+    async def _collect(self, **kwargs) -> list[str]:
+        return [chunk async for chunk in stream_ai_summary(**kwargs)]
+
+    @patch("src.services.llm_service.get_llm_service")
+    async def test_stream_yields_chunks(self, mock_get_service):
+        """Test LLM chunks are forwarded as they arrive"""
+        mock_llm = Mock()
+        mock_llm.generate_text_stream.return_value = iter(["AI ", "generated ", "summary"])
+        mock_get_service.return_value = mock_llm
+
+        chunks = await self._collect(question="Top states", sql="SELECT ...", results=self.RESULTS, row_count=2)
+
+        assert chunks == ["AI ", "generated ", "summary"]
+
+    @patch("src.services.llm_service.get_llm_service")
+    async def test_stream_empty_results(self, mock_get_service):
+        """Test zero rows yield the no-results template as one chunk"""
+        chunks = await self._collect(question="Top states", sql="SELECT ...", results=[], row_count=0)
+
+        assert chunks == [SIMPLE_SUMMARY_TEMPLATES["no_results"].format(filter_text="")]
+        mock_get_service.assert_not_called()
+
+    @pytest.mark.parametrize(
+        ("results", "expected"),
+        [([{"count": 5000}], "The answer is **5,000**."), ([{"n": 5}], "The answer is **5**.")],
+    )
+    @patch("src.services.llm_service.get_llm_service")
+    async def test_stream_single_value(self, mock_get_service, results, expected):
+        """Test a single scalar yields the template as one chunk without calling the LLM"""
+        chunks = await self._collect(question="How many?", sql="SELECT COUNT(*)", results=results, row_count=1)
+
+        assert chunks == [expected]
+        mock_get_service.assert_not_called()
+
+    @patch("src.services.llm_service.get_llm_service")
+    async def test_stream_failure_before_output_falls_back(self, mock_get_service):
+        """Test a stream that fails before any text yields the template summary"""
+
+        def failing_stream(*args):
+            raise RuntimeError("connection refused")
+            yield  # pragma: no cover
+
+        mock_llm = Mock()
+        mock_llm.generate_text_stream.side_effect = failing_stream
+        mock_get_service.return_value = mock_llm
+
+        chunks = await self._collect(question="Top states", sql="SELECT ...", results=self.RESULTS, row_count=2)
+
+        assert chunks == [generate_simple_summary("Top states", 2, self.RESULTS)]
+
+    @patch("src.services.llm_service.get_llm_service", side_effect=RuntimeError("no API key"))
+    async def test_stream_service_init_failure_falls_back(self, mock_get_service):
+        """Test an LLM service that fails to initialise yields the template summary"""
+        chunks = await self._collect(question="Top states", sql="SELECT ...", results=self.RESULTS, row_count=2)
+
+        assert chunks == [generate_simple_summary("Top states", 2, self.RESULTS)]
+
+    @patch("src.services.llm_service.get_llm_service")
+    async def test_stream_unsupported_provider_falls_back_uncached(self, mock_get_service):
+        """Test an unsupported provider yields the template summary, not placeholder text, and caches nothing"""
+        mock_get_service.return_value = Mock(generate_text_stream=_generate_text_stream)
+
+        with patch.object(settings, "llm_provider", "unsupported"):
+            chunks = await self._collect(question="Top states", sql="SELECT ...", results=self.RESULTS, row_count=2)
+
+        assert chunks == [generate_simple_summary("Top states", 2, self.RESULTS)]
+        assert UNSUPPORTED_PROVIDER_TEXT not in chunks
+        assert not ai_summary._summary_cache
+
+    @patch("src.services.llm_service.get_llm_service")
+    async def test_stream_truncation_note(self, mock_get_service):
+        """Test the truncation footnote is yielded after the streamed text"""
+        mock_llm = Mock()
+        mock_llm.generate_text_stream.return_value = iter(["Summary"])
+        mock_get_service.return_value = mock_llm
+        results = [{"state": f"S{i}", "count": i} for i in range(60)]
+
+        chunks = await self._collect(
+            question="Counts", sql="SELECT ...", results=results, row_count=60, llm_params={"summary_max_rows": 50}
+        )
+
+        assert chunks[0] == "Summary"
+        assert "50 of 60 rows" in chunks[-1]
+
 
 class TestGenerateSimpleSummary:
     """Test simple fallback summary generation"""
 
+    @pytest.mark.parametrize(
+        ("row_count", "template_key"),
+        [
+            (1, "few_results"),
+            (10, "few_results"),
+            (11, "medium_results"),
+            (100, "medium_results"),
+            (101, "large_results"),
+        ],
+    )
+    def test_row_count_bucket_boundaries(self, row_count, template_key):
+        """Test each row count picks the template for its bucket"""
+        summary = generate_simple_summary(question="Q", row_count=row_count, results=[{"a": 1, "b": 2}])
+
+        assert summary == SIMPLE_SUMMARY_TEMPLATES[template_key].format(count=f"{row_count:,}", filter_text="")
+
     def test_single_row_single_value(self):
         """Test simple summary for single row with single value"""
         results = [{"total": 12345}]
@@ -245,6 +628,22 @@ class TestFormatResultsForLLM:
         assert formatted[0]["state"] == "California"
         assert formatted[0]["status"] == "Active"
 
+    def test_ragged_rows_only_round_plain_numeric_strings(self):
+        """Test the per-cell path rounds numeric strings but leaves float() keywords alone"""
+        data = [{"amount": "12.345", "flag": "nan"}, {"amount": "inf"}]
+
+        formatted = _format_results_for_llm(data)
+
+        assert formatted == [{"amount": 12.35, "flag": "nan"}, {"amount": "inf"}]
+
+    def test_ragged_rows_round_float_subclasses(self):
+        """Test float subclasses such as numpy.float64 still round on the per-cell path"""
+        data = [{"rate": np.float64(1.2345)}, {"rate": 2.5, "extra": None}]
+
+        formatted = _format_results_for_llm(data)
+
+        assert formatted == [{"rate": 1.23}, {"rate": 2.5, "extra": None}]
+
     def test_preserve_integer_values(self):
         """Test that integer values are preserved"""
         data = [{"count": 100, "year": 2023}]
@@ -282,6 +681,238 @@ class TestFormatResultsForLLM:
         assert formatted[1]["rate"] == 6.79
         assert formatted[2]["rate"] == 7.46
 
+    def test_large_result_vectorized(self):
+        """Test column-wise rounding on large results matches the per-cell rules"""
+        data = [
+            {"rate": i + 0.12345, "amount": f"{i}.678", "state": "CA", "count": i, "note": None} for i in range(200)
+        ]
+
+        formatted = _format_results_for_llm(data)
+
+        assert len(formatted) == 200
+        assert formatted[10] == {"rate": 10.12, "amount": 10.68, "state": "CA", "count": 10, "note": None}
+        assert isinstance(formatted[10]["count"], int)
+
+    def test_vectorized_float_rounding_matches_round(self):
+        """Test the vectorized float path rounds ties and huge values exactly like round(value, 2)"""
+        edge_values = [0.015, 0.025, 2.675, -0.005, -2.675, 1.005, 1e307, -1e307, 123456789.125, -0.0]
+        values = edge_values * (ai_summary._VECTORIZE_MIN_ROWS // len(edge_values) + 1)
+
+        formatted = _format_results_for_llm([{"rate": value} for value in values])
+
+        assert [row["rate"] for row in formatted] == [round(value, 2) for value in values]
+
+    def test_vectorized_numeric_strings_match_per_cell(self):
+        """Test the vectorized string path rounds ties and huge values like the per-cell path"""
+        edge_values = ["2.675", "-0.005", "0.015", "-2.675", "1e307", "-1.005", "12.345", "n/a"]
+        values = edge_values * (ai_summary._VECTORIZE_MIN_ROWS // len(edge_values) + 1)
+
+        formatted = _format_results_for_llm([{"amount": value} for value in values])
+
+        assert [row["amount"] for row in formatted] == [_format_value(value) for value in values]
+
+    def test_large_result_vectorized_with_nulls(self):
+        """Test NULLs in float and string columns stay None on the vectorized path"""
+        data = [
+            {"rate": None if i % 3 == 0 else i + 0.12345, "amount": None if i % 4 == 0 else f"{i}.678", "flag": "inf"}
+            for i in range(100)
+        ]
+
+        formatted = _format_results_for_llm(data)
+
+        assert formatted[0] == {"rate": None, "amount": None, "flag": "inf"}
+        assert formatted[10] == {"rate": 10.12, "amount": 10.68, "flag": "inf"}
+
+    def test_column_handlers_skip_leading_nulls(self):
+        """Test a column's handler comes from its first non-null value"""
+        data = [
+            {"rate": None, "code": "A1", "amount": "1.005e2"},
+            {"rate": 2.345, "code": "311", "amount": "n/a"},
+        ]
+
+        formatted = _format_results_for_llm(data)
+
+        assert formatted == [
+            {"rate": None, "code": "A1", "amount": 100.5},
+            {"rate": 2.35, "code": 311.0, "amount": "n/a"},
+        ]
+
+    def test_format_truncates_large_input(self):
+        """Test that only max_rows rows are formatted, plus a truncation marker"""
+        data = [{"rate": i + 0.123} for i in range(1000)]
+
+        formatted = _format_results_for_llm(data, max_rows=50)
+
+        assert len(formatted) == 51
+        assert formatted[49] == {"rate": 49.12}
+        assert formatted[-1] == {"_truncated": "950 more rows omitted"}
+
+    def test_format_no_marker_within_max_rows(self):
+        """Test no truncation marker when data fits in max_rows"""
+        data = [{"rate": 1.234}, {"rate": 5.678}]
+
+        assert _format_results_for_llm(data, max_rows=50) == [{"rate": 1.23}, {"rate": 5.68}]
+
+    def test_large_ragged_result_uses_per_cell_loop(self):
+        """Test large results whose rows have different keys are not reshaped"""
+        data = [{"rate": 1.234}] * 100 + [{"other": "5.678"}]
+
+        formatted = _format_results_for_llm(data)
+
+        assert formatted[0] == {"rate": 1.23}
+        assert formatted[-1] == {"other": 5.68}
+
+
+class TestFormatResultsColumnar:
+    """Test the column-oriented formatting core"""
+
+    @pytest.mark.parametrize("row_count", [3, 100])
+    def test_columns_match_row_formatting(self, row_count):
+        """Test both the per-cell and vectorized paths return one formatted list per column"""
+        data = [{"state": "CA", "rate": 5.123, "count": i} for i in range(row_count)]
+
+        columns = _format_results_columnar(data)
+
+        assert list(columns) == ["state", "rate", "count"]
+        assert columns["rate"] == [5.12] * row_count
+        assert columns["count"] == list(range(row_count))
+        assert [dict(zip(columns, values, strict=True)) for values in zip(*columns.values(), strict=True)] == (
+            _format_results_for_llm(data)
+        )
+
+
+class TestToColumnar:
+    """Test row-to-column transposition"""
+
+    def test_to_columnar(self):
+        """Test rows become one list per column, preserving column and row order"""
+        rows = [{"state": "CA", "count": 1}, {"state": "TX", "count": 2}]
+
+        assert _to_columnar(rows) == {"state": ["CA", "TX"], "count": [1, 2]}
+
+    def test_to_columnar_empty(self):
+        """Test empty input has no columns"""
+        assert _to_columnar([]) == {}
+
+
+class TestDumpsForLLM:
+    """Test JSON serialization of results for the prompt"""
+
+    def test_round_trips_formatted_results(self):
+        """Test output is valid JSON with the same content"""
+        data = [{"state": "CA", "rate": 5.12, "count": 100, "amount": None}]
+
+        assert json.loads(_dumps_for_llm(data)) == data
+
+    def test_non_json_types_use_str(self):
+        """Test Decimal falls back to str and dates serialize as ISO strings"""
+        data = [{"benefit": Decimal("500.00"), "month": date(2023, 10, 1)}]
+
+        assert json.loads(_dumps_for_llm(data)) == [{"benefit": "500.00", "month": "2023-10-01"}]
+
+    def test_non_string_keys(self):
+        """Test integer keys are serialized as strings"""
+        assert json.loads(_dumps_for_llm({311: "Wages"})) == {"311": "Wages"}
+
+
+class TestCompactNumber:
+    """Test magnitude compaction of large floats for the prompt"""
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [
+            (123456789.12, "123.46M"),
+            (-2500000.5, "-2.50M"),
+            (4321000000.75, "4.32B"),
+            (1.5e12 + 0.5, "1.50T"),
+            (999999.99, 999999.99),
+            (12345678.0, 12345678.0),
+            (12345678, 12345678),
+            (True, True),
+            ("123456789.12", "123456789.12"),
+            (None, None),
+        ],
+    )
+    def test_compact_number(self, value, expected):
+        """Test only fractional floats of a million or more are compacted"""
+        assert _compact_number(value) == expected
+
+    @pytest.mark.parametrize("row_count", [1, 100])
+    def test_compact_only_when_requested(self, row_count):
+        """Test compact=True shortens large floats; the default keeps raw values"""
+        data = [{"state": "CA", "benefits": 123456789.123456, "households": 1500000}] * row_count
+
+        compacted = _format_results_for_llm(data, compact=True)
+        raw = _format_results_for_llm(data)
+
+        assert compacted[0] == {"state": "CA", "benefits": "123.46M", "households": 1500000}
+        assert raw[0]["benefits"] == 123456789.12
+
+    def test_compact_ragged_rows(self):
+        """Test ragged results are compacted through the per-cell path"""
+        data = [{"benefits": 123456789.123456}, {"state": "TX"}]
+
+        assert _format_results_for_llm(data, compact=True) == [{"benefits": "123.46M"}, {"state": "TX"}]
+
+    @patch("src.services.llm_service.get_llm_service")
+    async def test_prompt_uses_compacted_values(self, mock_get_service):
+        """Test the LLM sees the compact value, not every digit"""
+        mock_llm = Mock()
+        mock_llm.generate_text.return_value = "Summary"
+        mock_get_service.return_value = mock_llm
+
+        await generate_ai_summary(
+            question="Benefits by state",
+            sql="SELECT state, SUM(benefit)",
+            results=[{"state": "CA", "benefits": 123456789.123456}, {"state": "TX", "benefits": 98765432.1}],
+            row_count=2,
+        )
+
+        user_message = mock_llm.generate_text.call_args.args[0]
+        assert '"benefits":"123.46M"' in user_message
+        assert '"benefits":"98.77M"' in user_message
+        assert "123456789" not in user_message
+
+
+class TestPromptBuilder:
+    """Test incremental prompt assembly"""
+
+    def test_prompt_builder_no_double_alloc(self):
+        """Test size is tracked while appending and matches the single built prompt"""
+        data = [{"state": "CA", "note": "café"}]
+        builder = _PromptBuilder()
+        builder.append('USER\'S QUESTION: "Notes"')
+        builder.append("DATA TO ANALYZE:\n")
+        builder.append(_dumps_for_llm(data), new_section=False)
+        builder.append("Provide your analysis:")
+
+        prompt = builder.build()
+
+        assert builder.size == len(prompt.encode())
+        assert "café" in prompt
+
+    @patch("src.services.llm_service.get_llm_service")
+    async def test_user_message_matches_build_ai_summary_prompt(self, mock_get_service):
+        """Test the streamed user message is identical to build_ai_summary_prompt's"""
+        mock_llm = Mock()
+        mock_llm.generate_text.return_value = "Summary"
+        mock_get_service.return_value = mock_llm
+        results = [{"state": "CA", "count": 10}]
+
+        await generate_ai_summary(
+            question="Count by state", sql="SELECT state, count", results=results, row_count=1, filters="FY2023"
+        )
+
+        system_message, user_message = build_ai_summary_prompt(
+            question="Count by state",
+            data_context=_dumps_for_llm(results).decode(),
+            filters="FY2023",
+            sql="SELECT state, count",
+        )
+        args = mock_llm.generate_text.call_args.args
+        assert args[0] == user_message
+        assert args[3] == system_message
+
 
 class TestBuildCodeReference:
     """Test code reference section building"""
@@ -331,6 +962,14 @@ class TestBuildCodeReference:
         # Should be in numeric order
         assert pos_50 < pos_311 < pos_333
 
+    def test_presorted_keeps_given_order(self):
+        """Test presorted enrichment is emitted in dict order without re-sorting"""
+        enrichment = {"element_code": {"333": "SSI", "50": "Other", "311": "Wages"}}
+
+        result = _build_code_reference(enrichment, presorted=True)
+
+        assert result.find("Code 333") < result.find("Code 50") < result.find("Code 311")
+
     def test_mixed_numeric_and_non_numeric_codes(self):
         """Test sorting with mix of numeric and non-numeric codes"""
         enrichment = {"status": {"2": "Overissuance", "A": "Approved", "1": "Correct"}}
@@ -342,6 +981,30 @@ class TestBuildCodeReference:
         assert "Code 2" in result
         assert "Code A" in result
 
+    def test_sort_code_items_order(self):
+        """Test numeric codes come first in numeric order, then the rest by code"""
+        items = {("B", "Beta"), ("10", "Ten"), ("A", "Alpha"), ("9", "Nine"), (-1, "Negative")}
+
+        assert _sort_code_items(items) == [
+            (-1, "Negative"),
+            ("9", "Nine"),
+            ("10", "Ten"),
+            ("A", "Alpha"),
+            ("B", "Beta"),
+        ]
+
+    def test_sort_code_items_padded_and_unicode_codes(self):
+        """Test every string int() accepts sorts numerically, and anything else sorts as text"""
+        items = [(" 7", "Padded"), ("-3", "Signed"), ("1_000", "Grouped"), ("²", "Superscript"), ("٣", "Three")]
+
+        assert _sort_code_items(items) == [
+            ("-3", "Signed"),
+            ("٣", "Three"),
+            (" 7", "Padded"),
+            ("1_000", "Grouped"),
+            ("²", "Superscript"),
+        ]
+
     def test_code_reference_structure(self):
         """Test that code reference has proper header and footer"""
         enrichment = {"element_code": {"311": "Wages"}}
@@ -352,11 +1015,34 @@ class TestBuildCodeReference:
         assert len(result) > 20  # More than just the code
         assert "311" in result
 
+    def test_code_reference_cached(self):
+        """Test that equal enrichments reuse the cached reference text"""
+        first = _build_code_reference({"element_code": {"311": "Wages", "333": "SSI"}})
+        hits_before = _cached_code_reference.cache_info().hits
+
+        second = _build_code_reference({"element_code": {"311": "Wages", "333": "SSI"}})
+
+        assert second == first
+        assert _cached_code_reference.cache_info().hits == hits_before + 1
+
+    def test_code_reference_keeps_column_order(self):
+        """Test columns are listed in enrichment order"""
+        result = _build_code_reference({"status": {"1": "Active"}, "element_code": {"311": "Wages"}})
+
+        assert result.find("Status:") < result.find("Element Code:")
+
+    def test_code_reference_equal_codes_keep_dict_order(self):
+        """Test codes that sort as equal keep their enrichment order"""
+        first = _build_code_reference({"status": {"01": "Padded", "1": "Plain"}})
+        second = _build_code_reference({"status": {"1": "Plain", "01": "Padded"}})
+
+        assert first.find("Code 01") < first.find("Code 1:")
+        assert second.find("Code 1:") < second.find("Code 01")
+
 
 class TestAISummaryEdgeCases:
     """Test edge cases in AI summary generation"""
 
-    @pytest.mark.asyncio
     async def test_malformed_results(self):
         """Test handling of malformed results"""
         results = [None, {"broken": "data"}, {}]
@@ -366,7 +1052,6 @@ class TestAISummaryEdgeCases:
 
         assert isinstance(summary, str)
 
-    @pytest.mark.asyncio
     @patch("src.services.ai_summary.enrich_results_with_code_descriptions")
     async def test_enrichment_raises_exception(self, mock_enrich):
         """Test handling when code enrichment raises exception"""
@@ -398,7 +1083,6 @@ class TestAISummaryEdgeCases:
 
         assert formatted[0]["amount"] == -123.46
 
-    @pytest.mark.asyncio
     @patch("src.clients.api_client.call_api")
     @patch("src.services.ai_summary.enrich_results_with_code_descriptions")
     async def test_api_response_missing_text_key(self, mock_enrich, mock_call_api):
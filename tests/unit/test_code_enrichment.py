@@ -5,8 +5,11 @@ Tests code lookup loading and enrichment functionality.
 """
 
 import json
-from unittest.mock import mock_open, patch
+from unittest.mock import Mock, patch
 
+import pytest
+
+import src.services.code_enrichment as code_enrichment
 from src.services.code_enrichment import (
     CODE_COLUMN_MAPPINGS,
     clear_cache,
@@ -14,40 +17,74 @@ from src.services.code_enrichment import (
     load_code_lookups,
 )
 
+# Code columns the SNAP dataset must map to a lookup table
+_EXPECTED_CODE_COLUMNS = frozenset(
+    {
+        "element_code",
+        "nature_code",
+        "status",
+        "error_finding",
+        "case_classification",
+        "sex",
+        "snap_affiliation_code",
+        "agency_responsibility",
+    }
+)
+
+# data_mapping.json contents for the load tests, serialized once
+_MOCK_LOOKUPS = {
+    "code_lookups": {
+        "element_codes": {"311": "Wages and salaries", "333": "SSI"},
+        "nature_codes": {"35": "Unreported income"},
+        "status_codes": {"1": "Amount correct", "2": "Overissuance"},
+    }
+}
+_MOCK_LOOKUPS_JSON = json.dumps(_MOCK_LOOKUPS)
+
+
+@pytest.fixture(scope="module")
+def data_mapping_path(tmp_path_factory):
+    """data_mapping.json holding _MOCK_LOOKUPS, written once for the module"""
+    path = tmp_path_factory.mktemp("lookups") / "data_mapping.json"
+    path.write_text(_MOCK_LOOKUPS_JSON)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def _reset_code_cache():
+    """Start and end every test with empty code lookup and column mapping caches"""
+    clear_cache()
+    yield
+    clear_cache()
+
 
 class TestLoadCodeLookups:
     """Test code lookup loading from data_mapping.json"""
 
-    def test_load_code_lookups_success(self):
+    def test_load_code_lookups_success(self, data_mapping_path):
         """Test successful loading of code lookups"""
-        mock_data = {
-            "code_lookups": {
-                "element_codes": {"311": "Wages and salaries", "333": "SSI"},
-                "nature_codes": {"35": "Unreported income"},
-                "status_codes": {"1": "Amount correct", "2": "Overissuance"},
-            }
-        }
+        result = load_code_lookups(data_mapping_path)
 
-        with patch("builtins.open", mock_open(read_data=json.dumps(mock_data))):
-            with patch("pathlib.Path.exists", return_value=True):
-                # Clear cache first
-                import src.services.code_enrichment
+        assert len(result) == 3
+        assert result["element_codes"]["311"] == "Wages and salaries"
+        assert result["nature_codes"]["35"] == "Unreported income"
+        assert result["status_codes"]["2"] == "Overissuance"
 
-                src.services.code_enrichment._CODE_LOOKUPS_CACHE = None
+    def test_load_code_lookups_explicit_path_not_cached(self, tmp_path):
+        """Test an explicit path is read every call and leaves the module cache alone"""
+        mapping_path = tmp_path / "data_mapping.json"
+        mapping_path.write_text(json.dumps({"code_lookups": {"element_codes": {"311": "Wages"}}}))
+        load_code_lookups(mapping_path)
 
-                result = load_code_lookups()
+        mapping_path.write_text(json.dumps({"code_lookups": {"element_codes": {"311": "Wages and salaries"}}}))
 
-                assert len(result) == 3
-                assert result["element_codes"]["311"] == "Wages and salaries"
-                assert result["nature_codes"]["35"] == "Unreported income"
-                assert result["status_codes"]["2"] == "Overissuance"
+        assert load_code_lookups(mapping_path)["element_codes"]["311"] == "Wages and salaries"
+        assert code_enrichment._CODE_LOOKUPS_CACHE is None
 
-    def test_load_code_lookups_uses_cache(self):
+    def test_load_code_lookups_uses_cache(self, monkeypatch):
         """Test that subsequent loads use cache"""
-        import src.services.code_enrichment
-
         cached_data = {"test": "data"}
-        src.services.code_enrichment._CODE_LOOKUPS_CACHE = cached_data
+        monkeypatch.setattr(code_enrichment, "_CODE_LOOKUPS_CACHE", cached_data)
 
         result = load_code_lookups()
 
@@ -56,25 +93,20 @@ class TestLoadCodeLookups:
     def test_load_code_lookups_file_not_found(self):
         """Test handling when data_mapping.json not found"""
         with patch("pathlib.Path.exists", return_value=False):
-            import src.services.code_enrichment
-
-            src.services.code_enrichment._CODE_LOOKUPS_CACHE = None
-
             result = load_code_lookups()
 
             assert result == {}
 
-    def test_load_code_lookups_malformed_json(self):
-        """Test handling of malformed JSON"""
-        with patch("builtins.open", mock_open(read_data="invalid json")):
-            with patch("pathlib.Path.exists", return_value=True):
-                import src.services.code_enrichment
-
-                src.services.code_enrichment._CODE_LOOKUPS_CACHE = None
+    def test_load_code_lookups_explicit_path_missing(self, tmp_path):
+        """Test a missing explicit path returns no lookups"""
+        assert load_code_lookups(tmp_path / "missing.json") == {}
 
-                result = load_code_lookups()
+    def test_load_code_lookups_malformed_json(self, tmp_path):
+        """Test handling of malformed JSON"""
+        mapping_path = tmp_path / "data_mapping.json"
+        mapping_path.write_text("invalid json")
 
-                assert result == {}
+        assert load_code_lookups(mapping_path) == {}
 
 
 class TestEnrichResultsWithCodeDescriptions:
@@ -126,6 +158,21 @@ class TestEnrichResultsWithCodeDescriptions:
         assert "element_code" in lookups
         assert 999 not in lookups["element_code"]
 
+    @patch("src.services.code_enrichment.load_code_lookups")
+    def test_enrich_skips_lookup_metadata(self, mock_load):
+        """Test lookup table metadata keys are never used as code descriptions"""
+        mock_load.return_value = {"element_codes": {"description": "Element codes", "311": "Wages and salaries"}}
+
+        results = [{"element_code": "description"}, {"element_code": 311}, {"element_code": 999}]
+
+        lookups = enrich_results_with_code_descriptions(results)
+
+        assert lookups["element_code"] == {
+            "description": "Unknown code description",
+            "311": "Wages and salaries",
+            "999": "Unknown code 999",
+        }
+
     @patch("src.services.code_enrichment.load_code_lookups")
     def test_enrich_empty_results(self, mock_load):
         """Test enrichment with empty results"""
@@ -167,26 +214,20 @@ class TestCodeColumnMappings:
 
     def test_all_expected_mappings_present(self):
         """Test that all expected code columns are mapped"""
-        expected_columns = [
-            "element_code",
-            "nature_code",
-            "status",
-            "error_finding",
-            "case_classification",
-            "sex",
-            "snap_affiliation_code",
-            "agency_responsibility",
-        ]
-
-        for column in expected_columns:
-            assert column in CODE_COLUMN_MAPPINGS
-
-    def test_mappings_point_to_correct_lookup_keys(self):
+        assert _EXPECTED_CODE_COLUMNS - CODE_COLUMN_MAPPINGS.keys() == set()
+
+    @pytest.mark.parametrize(
+        ("column", "lookup_key"),
+        [
+            ("element_code", "element_codes"),
+            ("nature_code", "nature_codes"),
+            ("status", "status_codes"),
+            ("sex", "sex_codes"),
+        ],
+    )
+    def test_mappings_point_to_correct_lookup_keys(self, column, lookup_key):
         """Test that mappings point to expected lookup table names"""
-        assert CODE_COLUMN_MAPPINGS["element_code"] == "element_codes"
-        assert CODE_COLUMN_MAPPINGS["nature_code"] == "nature_codes"
-        assert CODE_COLUMN_MAPPINGS["status"] == "status_codes"
-        assert CODE_COLUMN_MAPPINGS["sex"] == "sex_codes"
+        assert CODE_COLUMN_MAPPINGS[column] == lookup_key
 
 
 class TestEnrichResultsEdgeCases:
@@ -209,19 +250,38 @@ class TestEnrichResultsEdgeCases:
 
         assert lookups == {}
 
+    @patch("src.services.code_enrichment.load_code_lookups")
+    def test_no_code_columns_skips_lookup_load(self, mock_load):
+        """Test results without code columns never load the code lookups"""
+        results = [{"state": "California", "count": 100}]
+
+        assert enrich_results_with_code_descriptions(results) == {}
+        mock_load.assert_not_called()
+
+    @patch("datasets.get_active_dataset")
+    def test_code_column_mappings_cached_per_dataset(self, mock_get_dataset):
+        """Test the active dataset's code column mappings are computed once, not per query"""
+        dataset = Mock()
+        dataset.name = "cached_dataset"
+        dataset.get_code_column_mappings.return_value = {"element_code": "element_codes"}
+        mock_get_dataset.return_value = dataset
+        results = [{"state": "California", "count": 100}]
+
+        enrich_results_with_code_descriptions(results)
+        enrich_results_with_code_descriptions(results)
+
+        dataset.get_code_column_mappings.assert_called_once()
+
 
 class TestClearCache:
     """Test cache clearing functionality"""
 
-    def test_clear_cache(self):
-        """Test that clear_cache clears the internal cache"""
-        # Load lookups to populate cache
-        load_code_lookups()
+    def test_clear_cache(self, monkeypatch):
+        """Test that clear_cache empties both the lookup and column mapping caches"""
+        monkeypatch.setattr(code_enrichment, "_CODE_LOOKUPS_CACHE", {"element_codes": {}})
+        code_enrichment._CODE_COLUMN_MAPPINGS_CACHE["snap"] = {"element_code": "element_codes"}
 
-        # Clear the cache
         clear_cache()
 
-        # Cache should be cleared (next load will repopulate)
-        # We can't directly test _CODE_LOOKUPS_CACHE, but we can verify the function runs
-        # The main test is that it doesn't crash
-        assert True  # clear_cache executed successfully
+        assert code_enrichment._CODE_LOOKUPS_CACHE is None
+        assert code_enrichment._CODE_COLUMN_MAPPINGS_CACHE == {}
@@ -4,148 +4,93 @@ Unit tests for Column Mapping
 Tests column name generation and mapping dictionaries.
 """
 
+import re
+
+import pytest
+
 from src.utils.column_mapping import (
     ERROR_LEVEL_VARIABLES,
+    ERROR_LEVEL_VARIABLES_KEYS,
     HOUSEHOLD_LEVEL_VARIABLES,
+    HOUSEHOLD_LEVEL_VARIABLES_KEYS,
     PERSON_LEVEL_VARIABLES,
-    get_all_error_columns,
-    get_all_person_columns,
+    PERSON_LEVEL_VARIABLES_KEYS,
     get_error_column_name,
     get_person_column_name,
     get_required_household_columns,
     get_required_person_columns,
 )
 
+# One column per variable per household member (1-17) / per error (1-9)
+_EXPECTED_PERSON_COUNT = len(PERSON_LEVEL_VARIABLES) * 17
+_EXPECTED_ERROR_COUNT = len(ERROR_LEVEL_VARIABLES) * 9
 
-class TestGetPersonColumnName:
-    """Test get_person_column_name function"""
-
-    def test_member_1(self):
-        """Test column name for first member"""
-        assert get_person_column_name("WAGES", 1) == "WAGES1"
-        assert get_person_column_name("AGE", 1) == "AGE1"
-        assert get_person_column_name("SEX", 1) == "SEX1"
+# Strips the member/error number off a wide-format column name, leaving the base variable
+_TRAILING_NUMBER_RE = re.compile(r"\d+$")
 
-    def test_member_17(self):
-        """Test column name for last member (17)"""
-        assert get_person_column_name("WAGES", 17) == "WAGES17"
-        assert get_person_column_name("AGE", 17) == "AGE17"
-        assert get_person_column_name("SEX", 17) == "SEX17"
 
-    def test_middle_members(self):
-        """Test column names for middle members"""
-        assert get_person_column_name("WAGES", 5) == "WAGES5"
-        assert get_person_column_name("WAGES", 10) == "WAGES10"
+class TestGetPersonColumnName:
+    """Test get_person_column_name function"""
 
-    def test_all_person_variables(self):
-        """Test with all person-level variable names"""
-        for var in PERSON_LEVEL_VARIABLES:
-            result = get_person_column_name(var, 1)
-            assert result == f"{var}1"
-            assert result.startswith(var)
+    @pytest.mark.parametrize("idx", [1, 5, 10, 17])
+    @pytest.mark.parametrize("var", list(PERSON_LEVEL_VARIABLES))
+    def test_person_column_name(self, var, idx):
+        """Test column name for every person variable at first, middle, and last member"""
+        assert get_person_column_name(var, idx) == f"{var}{idx}"
 
 
 class TestGetErrorColumnName:
     """Test get_error_column_name function"""
 
-    def test_error_1(self):
-        """Test column name for first error"""
-        assert get_error_column_name("ELEMENT", 1) == "ELEMENT1"
-        assert get_error_column_name("NATURE", 1) == "NATURE1"
-        assert get_error_column_name("AMOUNT", 1) == "AMOUNT1"
-
-    def test_error_9(self):
-        """Test column name for last error (9)"""
-        assert get_error_column_name("ELEMENT", 9) == "ELEMENT9"
-        assert get_error_column_name("NATURE", 9) == "NATURE9"
-        assert get_error_column_name("AMOUNT", 9) == "AMOUNT9"
-
-    def test_middle_errors(self):
-        """Test column names for middle errors"""
-        assert get_error_column_name("ELEMENT", 5) == "ELEMENT5"
-        assert get_error_column_name("NATURE", 3) == "NATURE3"
-
-    def test_all_error_variables(self):
-        """Test with all error-level variable names"""
-        for var in ERROR_LEVEL_VARIABLES:
-            result = get_error_column_name(var, 1)
-            assert result == f"{var}1"
-            assert result.startswith(var)
+    @pytest.mark.parametrize("idx", range(1, 10))
+    @pytest.mark.parametrize("var", list(ERROR_LEVEL_VARIABLES))
+    def test_error_column_name(self, var, idx):
+        """Test column name for every error variable at every error number (1-9)"""
+        assert get_error_column_name(var, idx) == f"{var}{idx}"
 
 
 class TestGetAllPersonColumns:
     """Test get_all_person_columns function"""
 
-    def test_returns_list(self):
+    def test_returns_list(self, all_person_columns):
         """Test function returns a list"""
-        result = get_all_person_columns()
-        assert isinstance(result, list)
+        assert isinstance(all_person_columns, list)
 
-    def test_correct_count(self):
+    def test_correct_count(self, all_person_columns):
         """Test returns correct number of columns"""
-        # Each person variable repeated 17 times
-        expected_count = len(PERSON_LEVEL_VARIABLES) * 17
-        result = get_all_person_columns()
-        assert len(result) == expected_count
-
-    def test_includes_first_member_columns(self):
-        """Test includes all first member columns"""
-        result = get_all_person_columns()
-        assert "WAGES1" in result
-        assert "AGE1" in result
-        assert "SEX1" in result
-        assert "FSAFIL1" in result
+        assert len(all_person_columns) == _EXPECTED_PERSON_COUNT
 
-    def test_includes_last_member_columns(self):
-        """Test includes all last member (17) columns"""
-        result = get_all_person_columns()
-        assert "WAGES17" in result
-        assert "AGE17" in result
-        assert "SEX17" in result
+    @pytest.mark.parametrize("column", ["WAGES1", "AGE1", "SEX1", "FSAFIL1", "WAGES17", "AGE17", "SEX17"])
+    def test_includes_first_and_last_member_columns(self, all_person_columns_set, column):
+        """Test includes first member and last member (17) columns"""
+        assert column in all_person_columns_set
 
-    def test_all_variables_represented(self):
-        """Test all person variables are represented"""
-        result = get_all_person_columns()
-        for var in PERSON_LEVEL_VARIABLES:
-            # Check at least one member column exists for each variable
-            assert any(col.startswith(var) for col in result)
+    def test_all_variables_represented(self, all_person_columns):
+        """Test all person variables are represented, and nothing else"""
+        present = {_TRAILING_NUMBER_RE.sub("", col) for col in all_person_columns}
+        assert present == PERSON_LEVEL_VARIABLES.keys()
 
 
 class TestGetAllErrorColumns:
     """Test get_all_error_columns function"""
 
-    def test_returns_list(self):
+    def test_returns_list(self, all_error_columns):
         """Test function returns a list"""
-        result = get_all_error_columns()
-        assert isinstance(result, list)
+        assert isinstance(all_error_columns, list)
 
-    def test_correct_count(self):
+    def test_correct_count(self, all_error_columns):
         """Test returns correct number of columns"""
-        # Each error variable repeated 9 times
-        expected_count = len(ERROR_LEVEL_VARIABLES) * 9
-        result = get_all_error_columns()
-        assert len(result) == expected_count
-
-    def test_includes_first_error_columns(self):
-        """Test includes all first error columns"""
-        result = get_all_error_columns()
-        assert "ELEMENT1" in result
-        assert "NATURE1" in result
-        assert "AMOUNT1" in result
-
-    def test_includes_last_error_columns(self):
-        """Test includes all last error (9) columns"""
-        result = get_all_error_columns()
-        assert "ELEMENT9" in result
-        assert "NATURE9" in result
-        assert "AMOUNT9" in result
-
-    def test_all_variables_represented(self):
-        """Test all error variables are represented"""
-        result = get_all_error_columns()
-        for var in ERROR_LEVEL_VARIABLES:
-            # Check at least one error column exists for each variable
-            assert any(col.startswith(var) for col in result)
+        assert len(all_error_columns) == _EXPECTED_ERROR_COUNT
+
+    @pytest.mark.parametrize("column", ["ELEMENT1", "NATURE1", "AMOUNT1", "ELEMENT9", "NATURE9", "AMOUNT9"])
+    def test_includes_first_and_last_error_columns(self, all_error_columns_set, column):
+        """Test includes first error and last error (9) columns"""
+        assert column in all_error_columns_set
+
+    def test_all_variables_represented(self, all_error_columns):
+        """Test all error variables are represented, and nothing else"""
+        present = {_TRAILING_NUMBER_RE.sub("", col) for col in all_error_columns}
+        assert present == ERROR_LEVEL_VARIABLES.keys()
 
 
 class TestGetRequiredHouseholdColumns:
@@ -219,26 +164,24 @@ class TestPersonLevelVariables:
 
     def test_includes_demographics(self):
         """Test includes demographic variables"""
-        assert "AGE" in PERSON_LEVEL_VARIABLES
-        assert "SEX" in PERSON_LEVEL_VARIABLES
-        assert "RACETH" in PERSON_LEVEL_VARIABLES
+        assert "AGE" in PERSON_LEVEL_VARIABLES_KEYS
+        assert "SEX" in PERSON_LEVEL_VARIABLES_KEYS
+        assert "RACETH" in PERSON_LEVEL_VARIABLES_KEYS
 
     def test_includes_income_variables(self):
         """Test includes income variables"""
-        assert "WAGES" in PERSON_LEVEL_VARIABLES
-        assert "SOCSEC" in PERSON_LEVEL_VARIABLES
-        assert "SSI" in PERSON_LEVEL_VARIABLES
-        assert "UNEMP" in PERSON_LEVEL_VARIABLES
+        assert "WAGES" in PERSON_LEVEL_VARIABLES_KEYS
+        assert "SOCSEC" in PERSON_LEVEL_VARIABLES_KEYS
+        assert "SSI" in PERSON_LEVEL_VARIABLES_KEYS
+        assert "UNEMP" in PERSON_LEVEL_VARIABLES_KEYS
 
     def test_all_values_are_strings(self):
         """Test all mapped values are strings"""
-        for value in PERSON_LEVEL_VARIABLES.values():
-            assert isinstance(value, str)
+        assert set(map(type, PERSON_LEVEL_VARIABLES.values())) == {str}
 
     def test_all_keys_are_strings(self):
         """Test all keys are strings"""
-        for key in PERSON_LEVEL_VARIABLES:
-            assert isinstance(key, str)
+        assert set(map(type, PERSON_LEVEL_VARIABLES)) == {str}
 
 
 class TestErrorLevelVariables:
@@ -254,15 +197,15 @@ class TestErrorLevelVariables:
 
     def test_includes_element(self):
         """Test includes element code"""
-        assert "ELEMENT" in ERROR_LEVEL_VARIABLES
+        assert "ELEMENT" in ERROR_LEVEL_VARIABLES_KEYS
 
     def test_includes_nature(self):
         """Test includes nature code"""
-        assert "NATURE" in ERROR_LEVEL_VARIABLES
+        assert "NATURE" in ERROR_LEVEL_VARIABLES_KEYS
 
     def test_includes_amount(self):
         """Test includes error amount"""
-        assert "AMOUNT" in ERROR_LEVEL_VARIABLES
+        assert "AMOUNT" in ERROR_LEVEL_VARIABLES_KEYS
 
     def test_correct_count(self):
         """Test has correct number of error variables"""
@@ -271,8 +214,7 @@ class TestErrorLevelVariables:
 
     def test_all_values_are_strings(self):
         """Test all mapped values are strings"""
-        for value in ERROR_LEVEL_VARIABLES.values():
-            assert isinstance(value, str)
+        assert set(map(type, ERROR_LEVEL_VARIABLES.values())) == {str}
 
 
 class TestHouseholdLevelVariables:
@@ -288,70 +230,82 @@ class TestHouseholdLevelVariables:
 
     def test_includes_case_id(self):
         """Test includes case ID"""
-        assert "HHLDNO" in HOUSEHOLD_LEVEL_VARIABLES
+        assert "HHLDNO" in HOUSEHOLD_LEVEL_VARIABLES_KEYS
         assert HOUSEHOLD_LEVEL_VARIABLES["HHLDNO"] == "case_id"
 
     def test_includes_geographic(self):
         """Test includes geographic variables"""
-        assert "STATE" in HOUSEHOLD_LEVEL_VARIABLES
-        assert "STATENAME" in HOUSEHOLD_LEVEL_VARIABLES
-        assert "REGIONCD" in HOUSEHOLD_LEVEL_VARIABLES
+        assert "STATE" in HOUSEHOLD_LEVEL_VARIABLES_KEYS
+        assert "STATENAME" in HOUSEHOLD_LEVEL_VARIABLES_KEYS
+        assert "REGIONCD" in HOUSEHOLD_LEVEL_VARIABLES_KEYS
 
     def test_includes_financial(self):
         """Test includes financial variables"""
-        assert "RAWGROSS" in HOUSEHOLD_LEVEL_VARIABLES
-        assert "RAWNET" in HOUSEHOLD_LEVEL_VARIABLES
-        assert "FSBEN" in HOUSEHOLD_LEVEL_VARIABLES
+        assert "RAWGROSS" in HOUSEHOLD_LEVEL_VARIABLES_KEYS
+        assert "RAWNET" in HOUSEHOLD_LEVEL_VARIABLES_KEYS
+        assert "FSBEN" in HOUSEHOLD_LEVEL_VARIABLES_KEYS
 
     def test_includes_composition(self):
         """Test includes household composition variables"""
-        assert "CERTHHSZ" in HOUSEHOLD_LEVEL_VARIABLES
-        assert "FSELDER" in HOUSEHOLD_LEVEL_VARIABLES
-        assert "FSKID" in HOUSEHOLD_LEVEL_VARIABLES
+        assert "CERTHHSZ" in HOUSEHOLD_LEVEL_VARIABLES_KEYS
+        assert "FSELDER" in HOUSEHOLD_LEVEL_VARIABLES_KEYS
+        assert "FSKID" in HOUSEHOLD_LEVEL_VARIABLES_KEYS
 
     def test_includes_weights(self):
         """Test includes statistical weights"""
-        assert "HWGT" in HOUSEHOLD_LEVEL_VARIABLES
-        assert "FYWGT" in HOUSEHOLD_LEVEL_VARIABLES
+        assert "HWGT" in HOUSEHOLD_LEVEL_VARIABLES_KEYS
+        assert "FYWGT" in HOUSEHOLD_LEVEL_VARIABLES_KEYS
 
     def test_all_values_are_strings(self):
         """Test all mapped values are strings"""
-        for value in HOUSEHOLD_LEVEL_VARIABLES.values():
-            assert isinstance(value, str)
+        assert set(map(type, HOUSEHOLD_LEVEL_VARIABLES.values())) == {str}
+
+
+class TestLevelVariableKeys:
+    """Test the frozen *_LEVEL_VARIABLES_KEYS sets"""
+
+    @pytest.mark.parametrize(
+        ("keys", "variables"),
+        [
+            (PERSON_LEVEL_VARIABLES_KEYS, PERSON_LEVEL_VARIABLES),
+            (ERROR_LEVEL_VARIABLES_KEYS, ERROR_LEVEL_VARIABLES),
+            (HOUSEHOLD_LEVEL_VARIABLES_KEYS, HOUSEHOLD_LEVEL_VARIABLES),
+        ],
+        ids=["person", "error", "household"],
+    )
+    def test_keys_match_mapping(self, keys, variables):
+        """Test each key set is a frozenset of exactly the mapping's source variables"""
+        assert isinstance(keys, frozenset)
+        assert keys == variables.keys()
 
 
 class TestColumnMappingIntegration:
     """Integration tests for column mapping functions"""
 
-    def test_no_duplicate_person_columns(self):
+    def test_no_duplicate_person_columns(self, all_person_columns, all_person_columns_set):
         """Test that get_all_person_columns has no duplicates"""
-        result = get_all_person_columns()
-        assert len(result) == len(set(result))
+        assert len(all_person_columns) == len(all_person_columns_set)
 
-    def test_no_duplicate_error_columns(self):
+    def test_no_duplicate_error_columns(self, all_error_columns, all_error_columns_set):
         """Test that get_all_error_columns has no duplicates"""
-        result = get_all_error_columns()
-        assert len(result) == len(set(result))
+        assert len(all_error_columns) == len(all_error_columns_set)
 
     def test_required_household_are_in_household_vars(self):
         """Test that required household columns exist in household variables"""
-        required = get_required_household_columns()
-        for col in required:
-            assert col in HOUSEHOLD_LEVEL_VARIABLES
+        missing = set(get_required_household_columns()) - HOUSEHOLD_LEVEL_VARIABLES.keys()
+        assert not missing, f"Required household columns not mapped: {missing}"
 
-    def test_required_person_follow_naming_convention(self):
+    def test_required_person_follow_naming_convention(self, all_person_columns_set):
         """Test that required person columns follow naming convention"""
         required = get_required_person_columns()
+        # Every <VAR><member> column is in the generated person columns
+        assert all_person_columns_set.issuperset(required)
         for col in required:
             # Should end with a digit
             assert col[-1].isdigit()
-            # Should have a base variable name
-            base = col[:-1]
-            assert base in PERSON_LEVEL_VARIABLES
 
-    def test_person_and_error_columns_dont_overlap(self):
+    def test_person_and_error_columns_dont_overlap(self, all_person_columns_set, all_error_columns_set):
         """Test that person and error columns don't overlap"""
-        person_cols = set(get_all_person_columns())
-        error_cols = set(get_all_error_columns())
-        overlap = person_cols & error_cols
-        assert len(overlap) == 0, f"Found overlapping columns: {overlap}"
+        assert all_person_columns_set.isdisjoint(all_error_columns_set), (
+            f"Found overlapping columns: {all_person_columns_set & all_error_columns_set}"
+        )
@@ -4,234 +4,139 @@ Unit tests for Configuration Management
 Tests settings properties and model selection logic.
 """
 
-from unittest.mock import patch
+import pytest
 
 from src.core.config import Settings, get_settings
 
+# Environment every Settings() needs, built once at import
+_BASE_ENV = {"DATABASE_URL": "postgresql://localhost/test", "SECRET_KEY": "test-key"}
+
+
+@pytest.fixture
+def base_env(monkeypatch):
+    """Set _BASE_ENV; tests add their own vars on the returned monkeypatch"""
+    for name, value in _BASE_ENV.items():
+        monkeypatch.setenv(name, value)
+    return monkeypatch
+
+
+@pytest.fixture(autouse=True)
+def _clear_settings_cache():
+    """Give each test its own get_settings() instance, built from that test's environment"""
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
 
 class TestSettingsProperties:
     """Test Settings property methods"""
 
-    def test_is_development(self):
+    def test_is_development(self, base_env):
         """Test is_development property"""
-        with patch.dict(
-            "os.environ",
-            {"ENVIRONMENT": "development", "DATABASE_URL": "postgresql://localhost/test", "SECRET_KEY": "test-key"},
-        ):
-            settings = Settings()
-            assert settings.is_development is True
-
-    def test_is_production(self):
+        base_env.setenv("ENVIRONMENT", "development")
+        settings = get_settings()
+        assert settings.is_development is True
+
+    def test_is_production(self, base_env):
         """Test is_production property"""
-        with patch.dict(
-            "os.environ",
-            {"ENVIRONMENT": "production", "DATABASE_URL": "postgresql://localhost/test", "SECRET_KEY": "test-key"},
-        ):
-            settings = Settings()
-            assert settings.is_production is True
-
-    def test_is_not_production_in_dev(self):
+        base_env.setenv("ENVIRONMENT", "production")
+        settings = get_settings()
+        assert settings.is_production is True
+
+    def test_is_not_production_in_dev(self, base_env):
         """Test is_production returns False in development"""
-        with patch.dict(
-            "os.environ",
-            {"ENVIRONMENT": "development", "DATABASE_URL": "postgresql://localhost/test", "SECRET_KEY": "test-key"},
-        ):
-            settings = Settings()
-            assert settings.is_production is False
+        base_env.setenv("ENVIRONMENT", "development")
+        settings = get_settings()
+        assert settings.is_production is False
 
 
 class TestSQLModel:
     """Test sql_model property"""
 
-    def test_sql_model_openai_default(self):
-        """Test SQL model default for OpenAI"""
-        with patch.dict(
-            "os.environ",
-            {
-                "LLM_PROVIDER": "openai",
-                "DATABASE_URL": "postgresql://localhost/test",
-                "SECRET_KEY": "test-key",
-                "LLM_SQL_MODEL": "",
-            },
-            clear=False,
-        ):
-            settings = Settings()
-            assert settings.sql_model == "gpt-4.1"
-
-    def test_sql_model_anthropic_default(self):
-        """Test SQL model default for Anthropic"""
-        with patch.dict(
-            "os.environ",
-            {
-                "LLM_PROVIDER": "anthropic",
-                "DATABASE_URL": "postgresql://localhost/test",
-                "SECRET_KEY": "test-key",
-                "LLM_SQL_MODEL": "",
-            },
-            clear=False,
-        ):
-            settings = Settings()
-            assert settings.sql_model == "claude-sonnet-4-20250514"
-
-    def test_sql_model_ollama_default(self):
-        """Test SQL model default for Ollama"""
-        with patch.dict(
-            "os.environ",
-            {
-                "LLM_PROVIDER": "ollama",
-                "DATABASE_URL": "postgresql://localhost/test",
-                "SECRET_KEY": "test-key",
-                "LLM_SQL_MODEL": "",
-            },
-            clear=False,
-        ):
-            settings = Settings()
-            assert settings.sql_model == "llama3.1:8b"
-
-    def test_sql_model_azure_openai_default(self):
-        """Test SQL model default for Azure OpenAI"""
-        with patch.dict(
-            "os.environ",
-            {
-                "LLM_PROVIDER": "azure_openai",
-                "DATABASE_URL": "postgresql://localhost/test",
-                "SECRET_KEY": "test-key",
-                "LLM_SQL_MODEL": "",
-            },
-            clear=False,
-        ):
-            settings = Settings()
-            assert settings.sql_model == "gpt-4.1"
-
-    def test_sql_model_custom_override(self):
+    @pytest.mark.parametrize(
+        ("provider", "expected"),
+        [
+            ("openai", "gpt-4.1"),
+            ("anthropic", "claude-sonnet-4-20250514"),
+            ("ollama", "llama3.1:8b"),
+            ("azure_openai", "gpt-4.1"),
+        ],
+    )
+    def test_sql_model_default(self, base_env, provider, expected):
+        """Test SQL model default per provider"""
+        base_env.setenv("LLM_PROVIDER", provider)
+        base_env.setenv("LLM_SQL_MODEL", "")
+        settings = get_settings()
+        assert settings.sql_model == expected
+
+    def test_sql_model_custom_override(self, base_env):
         """Test custom SQL model overrides default"""
-        with patch.dict(
-            "os.environ",
-            {
-                "LLM_PROVIDER": "openai",
-                "LLM_SQL_MODEL": "gpt-4o",
-                "DATABASE_URL": "postgresql://localhost/test",
-                "SECRET_KEY": "test-key",
-            },
-        ):
-            settings = Settings()
-            assert settings.sql_model == "gpt-4o"
+        base_env.setenv("LLM_PROVIDER", "openai")
+        base_env.setenv("LLM_SQL_MODEL", "gpt-4o")
+        settings = get_settings()
+        assert settings.sql_model == "gpt-4o"
 
 
 class TestKBModel:
     """Test kb_model property"""
 
-    def test_kb_model_openai_default(self):
-        """Test KB model default for OpenAI"""
-        with patch.dict(
-            "os.environ",
-            {
-                "LLM_PROVIDER": "openai",
-                "DATABASE_URL": "postgresql://localhost/test",
-                "SECRET_KEY": "test-key",
-                "LLM_KB_MODEL": "",
-                "LLM_SQL_MODEL": "",
-            },
-            clear=False,
-        ):
-            settings = Settings()
-            assert settings.kb_model == "gpt-4.1-mini"
-
-    def test_kb_model_anthropic_default(self):
-        """Test KB model default for Anthropic"""
-        with patch.dict(
-            "os.environ",
-            {
-                "LLM_PROVIDER": "anthropic",
-                "DATABASE_URL": "postgresql://localhost/test",
-                "SECRET_KEY": "test-key",
-                "LLM_KB_MODEL": "",
-                "LLM_SQL_MODEL": "",
-            },
-            clear=False,
-        ):
-            settings = Settings()
-            assert settings.kb_model == "claude-haiku-4-5-20251001"
-
-    def test_kb_model_ollama_default(self):
-        """Test KB model default for Ollama"""
-        with patch.dict(
-            "os.environ",
-            {
-                "LLM_PROVIDER": "ollama",
-                "DATABASE_URL": "postgresql://localhost/test",
-                "SECRET_KEY": "test-key",
-                "LLM_KB_MODEL": "",
-                "LLM_SQL_MODEL": "",
-            },
-            clear=False,
-        ):
-            settings = Settings()
-            assert settings.kb_model == "llama3.1:8b"
-
-    def test_kb_model_custom_override(self):
+    @pytest.mark.parametrize(
+        ("provider", "expected"),
+        [
+            ("openai", "gpt-4.1-mini"),
+            ("anthropic", "claude-haiku-4-5-20251001"),
+            ("ollama", "llama3.1:8b"),
+            ("azure_openai", "gpt-4.1-mini"),
+        ],
+    )
+    def test_kb_model_default(self, base_env, provider, expected):
+        """Test KB model default per provider"""
+        base_env.setenv("LLM_PROVIDER", provider)
+        base_env.setenv("LLM_KB_MODEL", "")
+        base_env.setenv("LLM_SQL_MODEL", "")
+        settings = get_settings()
+        assert settings.kb_model == expected
+
+    def test_kb_model_custom_override(self, base_env):
         """Test custom KB model overrides default"""
-        with patch.dict(
-            "os.environ",
-            {
-                "LLM_PROVIDER": "openai",
-                "LLM_KB_MODEL": "gpt-4",
-                "DATABASE_URL": "postgresql://localhost/test",
-                "SECRET_KEY": "test-key",
-            },
-        ):
-            settings = Settings()
-            assert settings.kb_model == "gpt-4"
+        base_env.setenv("LLM_PROVIDER", "openai")
+        base_env.setenv("LLM_KB_MODEL", "gpt-4")
+        settings = get_settings()
+        assert settings.kb_model == "gpt-4"
 
 
 class TestEffectiveSettings:
     """Test effective settings properties"""
 
-    def test_effective_sql_max_tokens_default(self):
-        """Test effective SQL max tokens uses default"""
-        with patch.dict("os.environ", {"DATABASE_URL": "postgresql://localhost/test", "SECRET_KEY": "test-key"}):
-            settings = Settings()
-            assert settings.effective_sql_max_tokens == settings.llm_max_tokens
-
-    def test_effective_sql_max_tokens_custom(self):
-        """Test effective SQL max tokens uses custom value"""
-        with patch.dict(
-            "os.environ",
-            {"LLM_SQL_MAX_TOKENS": "4000", "DATABASE_URL": "postgresql://localhost/test", "SECRET_KEY": "test-key"},
-        ):
-            settings = Settings()
-            assert settings.effective_sql_max_tokens == 4000
-
-    def test_effective_sql_temperature_default(self):
-        """Test effective SQL temperature uses default"""
-        with patch.dict("os.environ", {"DATABASE_URL": "postgresql://localhost/test", "SECRET_KEY": "test-key"}):
-            settings = Settings()
-            assert settings.effective_sql_temperature == settings.llm_temperature
-
-    def test_effective_sql_temperature_custom(self):
-        """Test effective SQL temperature uses custom value"""
-        with patch.dict(
-            "os.environ",
-            {"LLM_SQL_TEMPERATURE": "0.5", "DATABASE_URL": "postgresql://localhost/test", "SECRET_KEY": "test-key"},
-        ):
-            settings = Settings()
-            assert settings.effective_sql_temperature == 0.5
-
-    def test_effective_kb_temperature_default(self):
-        """Test effective KB temperature uses llm_kb_temperature when set"""
-        with patch.dict("os.environ", {"DATABASE_URL": "postgresql://localhost/test", "SECRET_KEY": "test-key"}):
-            settings = Settings()
-            # effective_kb_temperature should return llm_kb_temperature (field default or .env)
-            assert settings.effective_kb_temperature == settings.llm_kb_temperature
-
-    def test_effective_kb_temperature_custom(self):
-        """Test effective KB temperature uses custom value"""
-        with patch.dict(
-            "os.environ",
-            {"LLM_KB_TEMPERATURE": "0.7", "DATABASE_URL": "postgresql://localhost/test", "SECRET_KEY": "test-key"},
-        ):
-            settings = Settings()
-            assert settings.effective_kb_temperature == 0.7
+    @pytest.mark.parametrize(
+        ("attr", "fallback_attr"),
+        [
+            ("effective_sql_max_tokens", "llm_max_tokens"),
+            ("effective_sql_temperature", "llm_temperature"),
+            # llm_kb_temperature has its own field default (or .env value), so it wins over llm_temperature
+            ("effective_kb_temperature", "llm_kb_temperature"),
+        ],
+        ids=["sql_max_tokens", "sql_temperature", "kb_temperature"],
+    )
+    def test_effective_default(self, base_env, attr, fallback_attr):
+        """Test effective setting falls back to its default source"""
+        settings = get_settings()
+        assert getattr(settings, attr) == getattr(settings, fallback_attr)
+
+    @pytest.mark.parametrize(
+        ("env_var", "value", "attr", "expected"),
+        [
+            ("LLM_SQL_MAX_TOKENS", "4000", "effective_sql_max_tokens", 4000),
+            ("LLM_SQL_TEMPERATURE", "0.5", "effective_sql_temperature", 0.5),
+            ("LLM_KB_TEMPERATURE", "0.7", "effective_kb_temperature", 0.7),
+        ],
+        ids=["sql_max_tokens", "sql_temperature", "kb_temperature"],
+    )
+    def test_effective_custom(self, base_env, env_var, value, attr, expected):
+        """Test effective setting uses the custom env value"""
+        base_env.setenv(env_var, value)
+        settings = get_settings()
+        assert getattr(settings, attr) == expected
 
 
 class TestGetSettings:
@@ -249,3 +154,12 @@ class TestGetSettings:
 
         # Should return same cached instance
         assert settings1 is settings2
+
+    def test_get_settings_reads_environment_after_cache_clear(self, base_env):
+        """Test a cleared cache builds settings from the current environment"""
+        base_env.setenv("ENVIRONMENT", "production")
+        assert get_settings().is_production is True
+
+        base_env.setenv("ENVIRONMENT", "development")
+        get_settings.cache_clear()
+        assert get_settings().is_development is True
@@ -4,7 +4,9 @@ Unit tests for Database Engine and Session Management
 Tests engine creation, session management, and database operations.
 """
 
-from unittest.mock import MagicMock, patch
+import importlib
+import sys
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 from sqlalchemy.orm import Session
@@ -18,6 +20,26 @@ from src.database.engine import (
     get_session_for_dataset,
 )
 
+# The src.database package re-exports its default Engine as `engine`, shadowing the submodule attribute
+engine_module = importlib.import_module("src.database.engine")
+
+
+@pytest.fixture
+def mock_session_local(monkeypatch):
+    """Session that SessionLocal() hands out for the duration of the test"""
+    session = Mock(spec=Session)
+    monkeypatch.setattr(engine_module, "SessionLocal", lambda: session)
+    return session
+
+
+@pytest.fixture(autouse=True)
+def _clear_dataset_engines(monkeypatch):
+    """Start each test with no cached dataset engines, and build MagicMock engines instead of real ones"""
+    engine_module._dataset_engines.clear()
+    monkeypatch.setattr(engine_module, "create_engine", lambda *_args, **_kwargs: MagicMock(name="engine"))
+    yield
+    engine_module._dataset_engines.clear()
+
 
 class TestCreateEngine:
     """Test engine creation"""
@@ -48,31 +70,21 @@ class TestGetEngineForDataset:
 
     def test_get_engine_returns_cached(self):
         """Test returns cached engine for same dataset"""
-        from src.database.engine import _dataset_engines
-
-        # Clear cache first
-        _dataset_engines.clear()
-
         # Get engine twice for same dataset
         engine1 = get_engine_for_dataset("snap")
         engine2 = get_engine_for_dataset("snap")
 
         # Should return same cached instance
         assert engine1 is engine2
-        assert "snap" in _dataset_engines
+        assert "snap" in engine_module._dataset_engines
 
     def test_get_engine_for_new_dataset(self):
         """Test engine creation for new dataset"""
-        from src.database.engine import _dataset_engines
-
-        # Clear cache
-        _dataset_engines.clear()
-
         # Get engine for new dataset
         engine = get_engine_for_dataset("new_dataset")
 
         assert engine is not None
-        assert "new_dataset" in _dataset_engines
+        assert "new_dataset" in engine_module._dataset_engines
 
 
 class TestGetActiveEngine:
@@ -110,60 +122,49 @@ class TestGetSessionForDataset:
 class TestGetDb:
     """Test get_db dependency"""
 
-    def test_get_db_generator(self):
-        """Test get_db yields and closes session"""
-        sessions = list(get_db())
+    def test_get_db_generator(self, mock_session_local):
+        """Test get_db yields one session and closes it when the generator is closed"""
+        gen = get_db()
+        session = next(gen)
+
+        assert session is mock_session_local
+        mock_session_local.close.assert_not_called()
 
-        # Should yield exactly one session
-        assert len(sessions) == 1
-        assert isinstance(sessions[0], Session)
+        gen.close()
 
-        # Session should be closed after generator exits
-        # (We can't easily test this without mocking SessionLocal)
+        mock_session_local.close.assert_called_once()
 
-    @patch("src.database.engine.SessionLocal")
     def test_get_db_closes_on_exit(self, mock_session_local):
         """Test get_db closes session on exit"""
-        mock_session = MagicMock()
-        mock_session_local.return_value = mock_session
-
         # Consume generator
         for _ in get_db():
             pass
 
         # Verify session was closed
-        mock_session.close.assert_called_once()
+        mock_session_local.close.assert_called_once()
 
 
 class TestGetDbContext:
     """Test get_db_context context manager"""
 
-    @patch("src.database.engine.SessionLocal")
     def test_get_db_context_success(self, mock_session_local):
         """Test successful database operation"""
-        mock_session = MagicMock()
-        mock_session_local.return_value = mock_session
-
         with get_db_context() as db:
-            assert db is mock_session
+            assert db is mock_session_local
 
         # Should commit and close
-        mock_session.commit.assert_called_once()
-        mock_session.close.assert_called_once()
+        mock_session_local.commit.assert_called_once()
+        mock_session_local.close.assert_called_once()
 
-    @patch("src.database.engine.SessionLocal")
     def test_get_db_context_exception(self, mock_session_local):
         """Test database operation with exception"""
-        mock_session = MagicMock()
-        mock_session_local.return_value = mock_session
-
         with pytest.raises(ValueError), get_db_context() as db:
             raise ValueError("Test error")
 
         # Should rollback and close
-        mock_session.rollback.assert_called_once()
-        mock_session.close.assert_called_once()
-        mock_session.commit.assert_not_called()
+        mock_session_local.rollback.assert_called_once()
+        mock_session_local.close.assert_called_once()
+        mock_session_local.commit.assert_not_called()
 
 
 class TestDatabaseInitialization:
@@ -197,11 +198,6 @@ class TestEngineCaching:
 
     def test_multiple_datasets_cached_separately(self):
         """Test different datasets get separate cached engines"""
-        from src.database.engine import _dataset_engines
-
-        # Clear cache
-        _dataset_engines.clear()
-
         # Get engines for different datasets
         engine1 = get_engine_for_dataset("dataset1")
         engine2 = get_engine_for_dataset("dataset2")
@@ -214,30 +210,16 @@ class TestEngineCaching:
         assert engine1 is engine3
 
         # Both should be in cache
-        assert "dataset1" in _dataset_engines
-        assert "dataset2" in _dataset_engines
+        assert "dataset1" in engine_module._dataset_engines
+        assert "dataset2" in engine_module._dataset_engines
 
-    def test_get_engine_for_dataset_import_error(self):
+    def test_get_engine_for_dataset_import_error(self, monkeypatch):
         """Test get_engine_for_dataset handles ImportError gracefully"""
-        import sys
+        # A None entry makes `import datasets` raise ImportError; monkeypatch restores the real module
+        monkeypatch.setitem(sys.modules, "datasets", None)
 
-        from src.database.engine import _dataset_engines
+        # Should fall back to public schema when datasets module not available
+        engine = get_engine_for_dataset("test_dataset_no_datasets_module")
 
-        # Clear cache
-        _dataset_engines.clear()
-
-        # Temporarily hide the datasets module
-        datasets_module = sys.modules.get("datasets")
-        if "datasets" in sys.modules:
-            del sys.modules["datasets"]
-
-        try:
-            # Should fall back to public schema when datasets module not available
-            engine = get_engine_for_dataset("test_dataset_no_datasets_module")
-
-            assert engine is not None
-            assert "test_dataset_no_datasets_module" in _dataset_engines
-        finally:
-            # Restore datasets module if it was there
-            if datasets_module is not None:
-                sys.modules["datasets"] = datasets_module
+        assert engine is not None
+        assert "test_dataset_no_datasets_module" in engine_module._dataset_engines
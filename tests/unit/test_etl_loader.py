@@ -4,16 +4,62 @@ Unit tests for ETL Loader
 Tests ETL orchestration and status tracking.
 """
 
-from unittest.mock import Mock, patch
+from datetime import datetime
+from unittest.mock import DEFAULT, Mock, patch
 
 import pytest
 
-from src.etl.loader import ETLStatus, check_references_ready
+from src.core.exceptions import DatabaseError, ValidationError
+from src.etl.loader import ETLLoader, ETLStatus, check_references_ready, clear_references_cache
+
+
+@pytest.fixture
+def make_status():
+    """Build an ETLStatus with the given fields set in one update"""
+
+    def _make(job_id="test", **fields):
+        status = ETLStatus(job_id=job_id)
+        unknown = fields.keys() - vars(status).keys()
+        assert not unknown, f"ETLStatus has no fields {unknown}"
+        vars(status).update(fields)
+        return status
+
+    return _make
+
+
+@pytest.fixture(autouse=True, scope="class")
+def _mock_etl_deps():
+    """Patch the loader's reader/transformer/validator/writer classes once per test class"""
+    with patch.multiple(
+        "src.etl.loader", CSVReader=DEFAULT, DataTransformer=DEFAULT, DataValidator=DEFAULT, DatabaseWriter=DEFAULT
+    ) as mocks:
+        yield mocks
+
+
+@pytest.fixture(scope="class")
+def default_loader(_mock_etl_deps):
+    """ETLLoader(fiscal_year=2023) shared by a class's read-only tests"""
+    return ETLLoader(fiscal_year=2023)
+
+
+@pytest.fixture
+def etl_mocks(_mock_etl_deps):
+    """The class-shared loader dependency mocks, cleared of earlier tests' configuration"""
+    for mock in _mock_etl_deps.values():
+        mock.reset_mock(return_value=True, side_effect=True)
+    return _mock_etl_deps
 
 
 class TestCheckReferencesReady:
     """Test check_references_ready function"""
 
+    @pytest.fixture(autouse=True)
+    def _clear_references_cache(self):
+        """Start and end each test without a cached ready result"""
+        clear_references_cache()
+        yield
+        clear_references_cache()
+
     @patch("src.database.init_database.check_references_populated")
     def test_references_ready(self, mock_check):
         """Test when references are populated"""
@@ -47,6 +93,38 @@ class TestCheckReferencesReady:
         assert ready is True
         assert empty == []
 
+    @patch("src.database.init_database.check_references_populated")
+    def test_cached_on_success(self, mock_check):
+        """Test a ready result is cached and later calls skip the database check"""
+        mock_check.return_value = (True, [])
+
+        results = [check_references_ready() for _ in range(3)]
+
+        assert results == [(True, [])] * 3
+        mock_check.assert_called_once()
+
+    @patch("src.database.init_database.check_references_populated")
+    def test_not_ready_and_errors_not_cached(self, mock_check):
+        """Test empty tables and failed checks are re-checked on the next call"""
+        mock_check.side_effect = [(False, ["ref_status"]), Exception("Database error"), (True, []), (False, [])]
+
+        assert check_references_ready() == (False, ["ref_status"])
+        assert check_references_ready() == (True, [])  # assumed OK, not cached
+        assert check_references_ready() == (True, [])
+        assert check_references_ready() == (True, [])  # cached, fourth result never requested
+        assert mock_check.call_count == 3
+
+    @patch("src.database.init_database.check_references_populated")
+    def test_clear_references_cache(self, mock_check):
+        """Test clearing the cache forces a fresh check"""
+        mock_check.return_value = (True, [])
+        check_references_ready()
+
+        clear_references_cache()
+        check_references_ready()
+
+        assert mock_check.call_count == 2
+
 
 class TestETLStatus:
     """Test ETLStatus class"""
@@ -87,43 +165,45 @@ class TestETLStatus:
         assert result["validation"]["errors_count"] == 0
         assert result["validation"]["warnings_count"] == 0
 
-    def test_to_dict_with_progress(self):
+    def test_to_dict_with_progress(self, make_status):
         """Test to_dict with progress"""
-        from datetime import datetime
-
-        status = ETLStatus(job_id="test-123")
-        status.status = "in_progress"
-        status.started_at = datetime(2023, 1, 1, 12, 0, 0)
-        status.total_rows = 1000
-        status.rows_processed = 500
-        status.rows_skipped = 50
-        status.households_created = 400
-        status.members_created = 1200
-        status.errors_created = 150
+        status = make_status(
+            job_id="test-123",
+            status="in_progress",
+            started_at=datetime(2023, 1, 1, 12, 0, 0),
+            total_rows=1000,
+            rows_processed=500,
+            rows_skipped=50,
+            households_created=400,
+            members_created=1200,
+            errors_created=150,
+        )
 
         result = status.to_dict()
 
         assert result["status"] == "in_progress"
         assert result["started_at"] == "2023-01-01T12:00:00"
-        assert result["progress"]["total_rows"] == 1000
-        assert result["progress"]["rows_processed"] == 500
-        assert result["progress"]["rows_skipped"] == 50
-        assert result["progress"]["rows_successful"] == 450  # 500 - 50
-        assert result["progress"]["percent_complete"] == 50  # 500/1000 * 100
-        assert result["progress"]["households_created"] == 400
-        assert result["progress"]["members_created"] == 1200
-        assert result["progress"]["errors_created"] == 150
-
-    def test_to_dict_completed(self):
+        assert result["progress"] == {
+            "total_rows": 1000,
+            "rows_processed": 500,
+            "rows_skipped": 50,
+            "rows_successful": 450,  # 500 - 50
+            "households_created": 400,
+            "members_created": 1200,
+            "errors_created": 150,
+            "percent_complete": 50,  # 500/1000 * 100
+        }
+
+    def test_to_dict_completed(self, make_status):
         """Test to_dict with completed status"""
-        from datetime import datetime
-
-        status = ETLStatus(job_id="test-123")
-        status.status = "completed"
-        status.started_at = datetime(2023, 1, 1, 12, 0, 0)
-        status.completed_at = datetime(2023, 1, 1, 12, 30, 0)
-        status.total_rows = 100
-        status.rows_processed = 100
+        status = make_status(
+            job_id="test-123",
+            status="completed",
+            started_at=datetime(2023, 1, 1, 12, 0, 0),
+            completed_at=datetime(2023, 1, 1, 12, 30, 0),
+            total_rows=100,
+            rows_processed=100,
+        )
 
         result = status.to_dict()
 
@@ -131,79 +211,76 @@ class TestETLStatus:
         assert result["completed_at"] == "2023-01-01T12:30:00"
         assert result["progress"]["percent_complete"] == 100
 
-    def test_to_dict_with_error(self):
+    def test_to_dict_with_error(self, make_status):
         """Test to_dict with error status"""
-        status = ETLStatus(job_id="test-123")
-        status.status = "failed"
-        status.error_message = "Database connection lost"
+        status = make_status(job_id="test-123", status="failed", error_message="Database connection lost")
 
         result = status.to_dict()
 
         assert result["status"] == "failed"
         assert result["error_message"] == "Database connection lost"
 
-    def test_to_dict_with_validation_issues(self):
+    def test_to_dict_with_validation_issues(self, make_status):
         """Test to_dict with validation errors and warnings"""
-        status = ETLStatus(job_id="test-123")
-        status.validation_errors = ["Error 1", "Error 2", "Error 3"]
-        status.validation_warnings = ["Warning 1"]
+        status = make_status(
+            job_id="test-123",
+            validation_errors=["Error 1", "Error 2", "Error 3"],
+            validation_warnings=["Warning 1"],
+        )
 
         result = status.to_dict()
 
         assert result["validation"]["errors_count"] == 3
         assert result["validation"]["warnings_count"] == 1
 
-    def test_percent_complete_zero_total(self):
+    def test_percent_complete_zero_total(self, make_status):
         """Test percent complete when total_rows is 0"""
-        status = ETLStatus(job_id="test-123")
-        status.total_rows = 0
-        status.rows_processed = 0
+        status = make_status(job_id="test-123", total_rows=0, rows_processed=0)
 
         result = status.to_dict()
 
         # Should not divide by zero
         assert result["progress"]["percent_complete"] == 0
 
-    def test_rows_successful_calculation(self):
+    def test_rows_successful_calculation(self, make_status):
         """Test rows_successful calculated field"""
-        status = ETLStatus(job_id="test-123")
-        status.rows_processed = 100
-        status.rows_skipped = 25
+        status = make_status(job_id="test-123", rows_processed=100, rows_skipped=25)
 
         result = status.to_dict()
 
         assert result["progress"]["rows_successful"] == 75
 
-    def test_all_status_values(self):
+    @pytest.mark.parametrize("status_value", ["pending", "in_progress", "completed", "failed"])
+    def test_all_status_values(self, make_status, status_value):
         """Test all possible status values"""
-        for status_value in ["pending", "in_progress", "completed", "failed"]:
-            status = ETLStatus(job_id="test")
-            status.status = status_value
+        status = make_status(status=status_value)
 
-            result = status.to_dict()
-            assert result["status"] == status_value
+        result = status.to_dict()
+        assert result["status"] == status_value
 
-    def test_progress_tracking_fields(self):
+    def test_progress_tracking_fields(self, make_status):
         """Test all progress tracking fields"""
-        status = ETLStatus(job_id="test")
-        status.total_rows = 1000
-        status.rows_processed = 800
-        status.rows_skipped = 50
-        status.households_created = 700
-        status.members_created = 2100
-        status.errors_created = 350
+        status = make_status(
+            total_rows=1000,
+            rows_processed=800,
+            rows_skipped=50,
+            households_created=700,
+            members_created=2100,
+            errors_created=350,
+        )
 
         result = status.to_dict()
-        progress = result["progress"]
 
-        assert progress["total_rows"] == 1000
-        assert progress["rows_processed"] == 800
-        assert progress["rows_skipped"] == 50
-        assert progress["rows_successful"] == 750
-        assert progress["households_created"] == 700
-        assert progress["members_created"] == 2100
-        assert progress["errors_created"] == 350
-        assert progress["percent_complete"] == 80
+        assert result["progress"] == {
+            "total_rows": 1000,
+            "rows_processed": 800,
+            "rows_skipped": 50,
+            "rows_successful": 750,
+            "households_created": 700,
+            "members_created": 2100,
+            "errors_created": 350,
+            "percent_complete": 80,
+        }
 
     def test_validation_counts_empty(self):
         """Test validation counts when lists are empty"""
@@ -211,47 +288,32 @@ class TestETLStatus:
 
         result = status.to_dict()
 
-        assert result["validation"]["errors_count"] == 0
-        assert result["validation"]["warnings_count"] == 0
+        assert result["validation"] == {"errors_count": 0, "warnings_count": 0}
 
-    def test_validation_counts_with_items(self):
+    def test_validation_counts_with_items(self, make_status):
         """Test validation counts with multiple items"""
-        status = ETLStatus(job_id="test")
-        status.validation_errors = ["E1", "E2", "E3", "E4", "E5"]
-        status.validation_warnings = ["W1", "W2"]
+        status = make_status(
+            validation_errors=["E1", "E2", "E3", "E4", "E5"],
+            validation_warnings=["W1", "W2"],
+        )
 
         result = status.to_dict()
 
-        assert result["validation"]["errors_count"] == 5
-        assert result["validation"]["warnings_count"] == 2
+        assert result["validation"] == {"errors_count": 5, "warnings_count": 2}
 
 
 class TestETLLoaderInit:
     """Test ETLLoader initialization"""
 
-    @patch("src.etl.loader.DatabaseWriter")
-    @patch("src.etl.loader.DataValidator")
-    @patch("src.etl.loader.DataTransformer")
-    @patch("src.etl.loader.CSVReader")
-    def test_init_basic(self, mock_reader, mock_transformer, mock_validator, mock_writer):
+    def test_init_basic(self, default_loader):
         """Test basic initialization"""
-        from src.etl.loader import ETLLoader
+        assert default_loader.fiscal_year == 2023
+        assert default_loader.batch_size == 10000
+        assert default_loader.strict_validation is False
+        assert default_loader.skip_validation is False
 
-        loader = ETLLoader(fiscal_year=2023)
-
-        assert loader.fiscal_year == 2023
-        assert loader.batch_size == 10000
-        assert loader.strict_validation is False
-        assert loader.skip_validation is False
-
-    @patch("src.etl.loader.DatabaseWriter")
-    @patch("src.etl.loader.DataValidator")
-    @patch("src.etl.loader.DataTransformer")
-    @patch("src.etl.loader.CSVReader")
-    def test_init_custom_params(self, mock_reader, mock_transformer, mock_validator, mock_writer):
+    def test_init_custom_params(self):
         """Test initialization with custom parameters"""
-        from src.etl.loader import ETLLoader
-
         loader = ETLLoader(fiscal_year=2022, batch_size=5000, strict_validation=True, skip_validation=True)
 
         assert loader.fiscal_year == 2022
@@ -259,70 +321,32 @@ class TestETLLoaderInit:
         assert loader.strict_validation is True
         assert loader.skip_validation is True
 
-    @patch("src.etl.loader.DatabaseWriter")
-    @patch("src.etl.loader.DataValidator")
-    @patch("src.etl.loader.DataTransformer")
-    @patch("src.etl.loader.CSVReader")
-    def test_has_required_attributes(self, mock_reader, mock_transformer, mock_validator, mock_writer):
+    def test_has_required_attributes(self, default_loader):
         """Test that ETLLoader has required attributes"""
-        from src.etl.loader import ETLLoader
-
-        loader = ETLLoader(fiscal_year=2023)
-
         # Should have all required attributes
-        assert hasattr(loader, "fiscal_year")
-        assert hasattr(loader, "batch_size")
-        assert hasattr(loader, "strict_validation")
-        assert hasattr(loader, "skip_validation")
+        missing = {"fiscal_year", "batch_size", "strict_validation", "skip_validation"} - vars(default_loader).keys()
+        assert not missing, f"ETLLoader is missing attributes {missing}"
 
 
 class TestETLLoaderValidation:
     """Test ETLLoader validation configuration"""
 
-    @patch("src.etl.loader.DatabaseWriter")
-    @patch("src.etl.loader.DataValidator")
-    @patch("src.etl.loader.DataTransformer")
-    @patch("src.etl.loader.CSVReader")
-    def test_validation_enabled_by_default(self, mock_reader, mock_transformer, mock_validator, mock_writer):
+    def test_validation_enabled_by_default(self, default_loader):
         """Test validation is enabled by default"""
-        from src.etl.loader import ETLLoader
-
-        loader = ETLLoader(fiscal_year=2023)
-
-        assert loader.skip_validation is False
+        assert default_loader.skip_validation is False
 
-    @patch("src.etl.loader.DatabaseWriter")
-    @patch("src.etl.loader.DataValidator")
-    @patch("src.etl.loader.DataTransformer")
-    @patch("src.etl.loader.CSVReader")
-    def test_can_skip_validation(self, mock_reader, mock_transformer, mock_validator, mock_writer):
+    def test_can_skip_validation(self):
         """Test can skip validation"""
-        from src.etl.loader import ETLLoader
-
         loader = ETLLoader(fiscal_year=2023, skip_validation=True)
 
         assert loader.skip_validation is True
 
-    @patch("src.etl.loader.DatabaseWriter")
-    @patch("src.etl.loader.DataValidator")
-    @patch("src.etl.loader.DataTransformer")
-    @patch("src.etl.loader.CSVReader")
-    def test_strict_validation_disabled_by_default(self, mock_reader, mock_transformer, mock_validator, mock_writer):
+    def test_strict_validation_disabled_by_default(self, default_loader):
         """Test strict validation is disabled by default"""
-        from src.etl.loader import ETLLoader
-
-        loader = ETLLoader(fiscal_year=2023)
-
-        assert loader.strict_validation is False
+        assert default_loader.strict_validation is False
 
-    @patch("src.etl.loader.DatabaseWriter")
-    @patch("src.etl.loader.DataValidator")
-    @patch("src.etl.loader.DataTransformer")
-    @patch("src.etl.loader.CSVReader")
-    def test_can_enable_strict_validation(self, mock_reader, mock_transformer, mock_validator, mock_writer):
+    def test_can_enable_strict_validation(self):
         """Test can enable strict validation"""
-        from src.etl.loader import ETLLoader
-
         loader = ETLLoader(fiscal_year=2023, strict_validation=True)
 
         assert loader.strict_validation is True
@@ -331,71 +355,27 @@ class TestETLLoaderValidation:
 class TestETLLoaderBatching:
     """Test ETLLoader batch configuration"""
 
-    @patch("src.etl.loader.DatabaseWriter")
-    @patch("src.etl.loader.DataValidator")
-    @patch("src.etl.loader.DataTransformer")
-    @patch("src.etl.loader.CSVReader")
-    def test_default_batch_size(self, mock_reader, mock_transformer, mock_validator, mock_writer):
+    def test_default_batch_size(self, default_loader):
         """Test default batch size"""
-        from src.etl.loader import ETLLoader
-
-        loader = ETLLoader(fiscal_year=2023)
-
-        assert loader.batch_size == 10000
-
-    @patch("src.etl.loader.DatabaseWriter")
-    @patch("src.etl.loader.DataValidator")
-    @patch("src.etl.loader.DataTransformer")
-    @patch("src.etl.loader.CSVReader")
-    def test_custom_batch_size(self, mock_reader, mock_transformer, mock_validator, mock_writer):
-        """Test custom batch size"""
-        from src.etl.loader import ETLLoader
-
-        loader = ETLLoader(fiscal_year=2023, batch_size=1000)
+        assert default_loader.batch_size == 10000
 
-        assert loader.batch_size == 1000
+    @pytest.mark.parametrize("batch_size", [100, 1000, 50000])
+    def test_custom_batch_size(self, batch_size):
+        """Test small, custom and large batch sizes are kept as given"""
+        loader = ETLLoader(fiscal_year=2023, batch_size=batch_size)
 
-    @patch("src.etl.loader.DatabaseWriter")
-    @patch("src.etl.loader.DataValidator")
-    @patch("src.etl.loader.DataTransformer")
-    @patch("src.etl.loader.CSVReader")
-    def test_large_batch_size(self, mock_reader, mock_transformer, mock_validator, mock_writer):
-        """Test large batch size"""
-        from src.etl.loader import ETLLoader
-
-        loader = ETLLoader(fiscal_year=2023, batch_size=50000)
-
-        assert loader.batch_size == 50000
-
-    @patch("src.etl.loader.DatabaseWriter")
-    @patch("src.etl.loader.DataValidator")
-    @patch("src.etl.loader.DataTransformer")
-    @patch("src.etl.loader.CSVReader")
-    def test_small_batch_size(self, mock_reader, mock_transformer, mock_validator, mock_writer):
-        """Test small batch size"""
-        from src.etl.loader import ETLLoader
-
-        loader = ETLLoader(fiscal_year=2023, batch_size=100)
-
-        assert loader.batch_size == 100
+        assert loader.batch_size == batch_size
 
 
 class TestETLLoaderErrorHandling:
     """Test ETLLoader error handling"""
 
-    @patch("src.etl.loader.DatabaseWriter")
-    @patch("src.etl.loader.DataValidator")
-    @patch("src.etl.loader.DataTransformer")
-    @patch("src.etl.loader.CSVReader")
-    def test_load_validation_error(self, mock_reader_cls, mock_transformer, mock_validator, mock_writer):
+    def test_load_validation_error(self, etl_mocks):
         """Test load handles ValidationError"""
-        from src.core.exceptions import ValidationError
-        from src.etl.loader import ETLLoader
-
         # Mock reader
         mock_reader = Mock()
         mock_reader.get_row_count.return_value = 50
-        mock_reader_cls.return_value = mock_reader
+        etl_mocks["CSVReader"].return_value = mock_reader
         mock_reader.read_csv.side_effect = ValidationError("Invalid CSV format")
 
         loader = ETLLoader(fiscal_year=2023)
@@ -403,44 +383,31 @@ class TestETLLoaderErrorHandling:
         with pytest.raises(ValidationError):
             loader.load_from_file("/fake/path.csv")
 
-    @patch("src.etl.loader.DatabaseWriter")
-    @patch("src.etl.loader.DataValidator")
-    @patch("src.etl.loader.DataTransformer")
-    @patch("src.etl.loader.CSVReader")
-    def test_load_database_error(self, mock_reader_cls, mock_transformer, mock_validator, mock_writer):
+    def test_load_database_error(self, etl_mocks):
         """Test load handles DatabaseError"""
-        from src.core.exceptions import DatabaseError
-        from src.etl.loader import ETLLoader
-
         # Mock reader
         mock_reader = Mock()
         mock_reader.get_row_count.return_value = 50
-        mock_reader.read_csv.return_value = Mock(spec=["__len__"], __len__=Mock(return_value=50))
-        mock_reader_cls.return_value = mock_reader
+        mock_reader.read_csv.return_value = [None] * 50
+        etl_mocks["CSVReader"].return_value = mock_reader
 
         # Mock transformer
         mock_transformer_inst = Mock()
         mock_transformer_inst.transform.side_effect = DatabaseError("Connection lost")
-        mock_transformer.return_value = mock_transformer_inst
+        etl_mocks["DataTransformer"].return_value = mock_transformer_inst
 
         loader = ETLLoader(fiscal_year=2023)
 
         with pytest.raises(DatabaseError):
             loader.load_from_file("/fake/path.csv")
 
-    @patch("src.etl.loader.DatabaseWriter")
-    @patch("src.etl.loader.DataValidator")
-    @patch("src.etl.loader.DataTransformer")
-    @patch("src.etl.loader.CSVReader")
-    def test_load_unexpected_error(self, mock_reader_cls, mock_transformer, mock_validator, mock_writer):
+    def test_load_unexpected_error(self, etl_mocks):
         """Test load handles unexpected exceptions"""
-        from src.etl.loader import ETLLoader
-
         # Mock reader
         mock_reader = Mock()
         mock_reader.get_row_count.return_value = 50
         mock_reader.read_csv.side_effect = RuntimeError("Unexpected error")
-        mock_reader_cls.return_value = mock_reader
+        etl_mocks["CSVReader"].return_value = mock_reader
 
         loader = ETLLoader(fiscal_year=2023)
 
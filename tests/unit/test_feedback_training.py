@@ -1,34 +1,49 @@
 """Tests for feedback-driven Vanna training."""
 
+import hashlib
+import json
 import sys
+import uuid
+from collections import OrderedDict
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-# Mock chainlit before importing ui.services (ui/services/__init__.py imports startup.py which needs chainlit).
-# Use spec-less MagicMock but configure user_session.get to return None by default,
-# so filter_manager._get_user_id() falls through to the DB fallback path correctly.
-if "chainlit" not in sys.modules:
-    _mock_chainlit = MagicMock()
-    _mock_chainlit.user_session.get.return_value = None
-    sys.modules["chainlit"] = _mock_chainlit
+# ui/services/__init__.py imports startup.py, which needs chainlit. Stub it only while importing,
+# so the stub does not leak into other test modules (e.g. filter_manager's lazy chainlit import).
+with pytest.MonkeyPatch.context() as _mp:
+    if "chainlit" not in sys.modules:
+        _mp.setitem(sys.modules, "chainlit", MagicMock())
 
-from ui.services.feedback_training import (  # noqa: E402
-    _QUERY_MAP_MAX,
-    _compute_training_id,
-    _query_map,
-    get_query_for_feedback,
-    handle_feedback_training,
-    store_query_for_feedback,
-)
+    import ui.services.feedback_training as feedback_training
+    from ui.services.feedback_training import (
+        _QUERY_MAP_MAX,
+        _compute_training_id,
+        get_query_for_feedback,
+        handle_feedback_training,
+        store_query_for_feedback,
+    )
+
+# Vanna's deterministic_uuid namespace for training data IDs
+_VANNA_NAMESPACE = uuid.UUID("00000000-0000-0000-0000-000000000000")
+
+
+def _reference_training_id(question: str, sql: str) -> str:
+    """Replicate Vanna's question/SQL training ID computation exactly."""
+    content = json.dumps({"question": question, "sql": sql}, ensure_ascii=False)
+    hash_hex = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    return str(uuid.uuid5(_VANNA_NAMESPACE, hash_hex)) + "-sql"
+
+
+_VANNA_QUESTION = "What is the payment error rate?"
+_VANNA_SQL = "SELECT state, error_rate FROM state_error_rates"
+_EXPECTED_VANNA_ID = _reference_training_id(_VANNA_QUESTION, _VANNA_SQL)
 
 
 @pytest.fixture(autouse=True)
-def clear_query_map():
-    """Clear the module-level query map before each test."""
-    _query_map.clear()
-    yield
-    _query_map.clear()
+def clear_query_map(monkeypatch):
+    """Give each test an empty module-level query map; the original is restored afterwards."""
+    monkeypatch.setattr(feedback_training, "_query_map", OrderedDict())
 
 
 class TestQueryMap:
@@ -44,10 +59,12 @@ class TestQueryMap:
 
     def test_query_map_bounded(self):
         """Verify oldest entries evicted at max size."""
-        for i in range(_QUERY_MAP_MAX + 10):
+        # Fill the map to capacity in one update; only the 10 overflowing stores go through eviction
+        feedback_training._query_map.update((f"msg-{i}", (f"question-{i}", f"sql-{i}")) for i in range(_QUERY_MAP_MAX))
+        for i in range(_QUERY_MAP_MAX, _QUERY_MAP_MAX + 10):
             store_query_for_feedback(f"msg-{i}", f"question-{i}", f"sql-{i}")
 
-        assert len(_query_map) == _QUERY_MAP_MAX
+        assert len(feedback_training._query_map) == _QUERY_MAP_MAX
         # First 10 should be evicted
         assert get_query_for_feedback("msg-0") is None
         assert get_query_for_feedback("msg-9") is None
@@ -75,28 +92,10 @@ class TestComputeTrainingId:
 
     def test_matches_vanna_computation(self):
         """Verify our ID computation matches Vanna's deterministic_uuid + '-sql'."""
-        import hashlib
-        import json
-        import uuid
-
-        question = "What is the payment error rate?"
-        sql = "SELECT state, error_rate FROM state_error_rates"
-
-        # Our computation
-        our_id = _compute_training_id(question, sql)
-
-        # Replicate Vanna's computation exactly
-        content = json.dumps({"question": question, "sql": sql}, ensure_ascii=False)
-        content_bytes = content.encode("utf-8")
-        hash_hex = hashlib.sha256(content_bytes).hexdigest()
-        namespace = uuid.UUID("00000000-0000-0000-0000-000000000000")
-        vanna_id = str(uuid.uuid5(namespace, hash_hex)) + "-sql"
-
-        assert our_id == vanna_id
+        assert _compute_training_id(_VANNA_QUESTION, _VANNA_SQL) == _EXPECTED_VANNA_ID
 
 
 class TestHandleFeedbackTraining:
-    @pytest.mark.asyncio
     async def test_positive_trains(self):
         """Thumbs up calls vn.train() with correct question+sql."""
         store_query_for_feedback("msg-1", "What is X?", "SELECT x FROM t")
@@ -113,7 +112,6 @@ class TestHandleFeedbackTraining:
 
         mock_vn.train.assert_called_once_with(question="What is X?", sql="SELECT x FROM t")
 
-    @pytest.mark.asyncio
     async def test_negative_removes(self):
         """Thumbs down calls vn.remove_training_data() with computed ID."""
         store_query_for_feedback("msg-1", "What is X?", "SELECT x FROM t")
@@ -131,7 +129,6 @@ class TestHandleFeedbackTraining:
 
         mock_vn.remove_training_data.assert_called_once_with(id=expected_id)
 
-    @pytest.mark.asyncio
     async def test_disabled_skips_training(self):
         """When vanna_store_user_queries=False, no training occurs."""
         store_query_for_feedback("msg-1", "What is X?", "SELECT x FROM t")
@@ -145,7 +142,6 @@ class TestHandleFeedbackTraining:
 
         mock_get_vn.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_non_sql_message_noop(self):
         """Feedback on unknown message ID (non-SQL) is a no-op."""
         with (
@@ -157,7 +153,6 @@ class TestHandleFeedbackTraining:
 
         mock_get_vn.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_training_error_does_not_propagate(self):
         """Training errors are logged but don't propagate."""
         store_query_for_feedback("msg-1", "What is X?", "SELECT x FROM t")
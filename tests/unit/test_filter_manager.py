@@ -9,7 +9,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from src.core.filter_manager import DataFilter, FilterManager, get_filter_manager
+from src.core.filter_manager import DataFilter, FilterManager, _sql_conditions, get_filter_manager
 
 
 class TestDataFilterBasics:
@@ -137,6 +137,33 @@ class TestDataFilterSQLConditions:
 
         assert len(conditions) == 0
 
+    def test_conditions_memoized_across_instances(self):
+        """Test filters with the same contents reuse the rendered conditions"""
+        _sql_conditions.cache_clear()
+
+        DataFilter(states=["Ohio"], fiscal_years=[2022]).get_sql_conditions()
+        conditions = DataFilter(states=["Ohio"], fiscal_years=[2022]).get_sql_conditions()
+
+        assert conditions == ["state_name = 'Ohio'", "fiscal_year = 2022"]
+        assert _sql_conditions.cache_info().hits == 1
+
+    def test_conditions_follow_mutation(self):
+        """Test changing a filter's states is reflected in its conditions"""
+        filter = DataFilter(states=["Ohio"])
+        filter.get_sql_conditions().append("mutated by caller")
+
+        filter.states = ["Texas"]
+
+        assert filter.get_sql_conditions() == ["state_name = 'Texas'"]
+        assert DataFilter(states=["Ohio"]).get_sql_conditions() == ["state_name = 'Ohio'"]
+
+    def test_cached_conditions_still_validate(self):
+        """Test a value equal to a cached one (2023.0 == 2023) is still rejected"""
+        DataFilter(fiscal_years=[2023]).get_sql_conditions()
+
+        with pytest.raises(ValueError, match="Invalid fiscal year"):
+            DataFilter(fiscal_years=[2023.0]).get_sql_conditions()
+
 
 class TestDataFilterDescription:
     """Test human-readable descriptions"""
@@ -334,6 +361,36 @@ class TestFilterManagerGetUserID:
         assert user_id == "default"
         mock_session.close.assert_called_once()
 
+    @patch("src.database.engine.SessionLocal")
+    def test_get_user_id_database_fallback_cached(self, mock_session_local):
+        """Test the database fallback user is reused until its TTL expires"""
+        mock_session = mock_session_local.return_value
+        mock_session.execute.return_value.fetchone.return_value = ("db_user_456",)
+
+        manager = FilterManager()
+        with patch("src.core.filter_manager.time.monotonic", return_value=1000.0):
+            assert manager._get_user_id() == "db_user_456"
+            assert manager._get_user_id() == "db_user_456"
+
+        mock_session_local.assert_called_once()
+
+        expired = 1000.0 + FilterManager.FALLBACK_USER_TTL_SECONDS
+        with patch("src.core.filter_manager.time.monotonic", return_value=expired):
+            assert manager._get_user_id() == "db_user_456"
+
+        assert mock_session_local.call_count == 2
+
+    @patch("src.database.engine.SessionLocal")
+    def test_get_user_id_default_not_cached(self, mock_session_local):
+        """Test a missing database user is looked up again on the next call"""
+        mock_session = mock_session_local.return_value
+        mock_session.execute.return_value.fetchone.side_effect = [None, ("db_user_456",)]
+
+        manager = FilterManager()
+
+        assert manager._get_user_id() == "default"
+        assert manager._get_user_id() == "db_user_456"
+
 
 class TestFilterManagerGetFilter:
     """Test FilterManager get_filter method"""
@@ -392,6 +449,71 @@ class TestFilterManagerGetFilter:
 
         assert filter_obj.is_empty is True
 
+    @patch.object(FilterManager, "_get_user_id", return_value="test_user")
+    @patch("src.database.engine.SessionLocal", side_effect=Exception("DB error"))
+    def test_get_filter_database_error_not_cached(self, mock_session_local, mock_get_user_id):
+        """Test a failed load is retried on the next call"""
+        manager = FilterManager()
+        manager.get_filter()
+        manager.get_filter()
+
+        assert mock_session_local.call_count == 2
+
+    @patch.object(FilterManager, "_get_user_id", return_value="test_user")
+    @patch("src.database.engine.SessionLocal")
+    def test_get_filter_cached_per_user(self, mock_session_local, mock_get_user_id):
+        """Test repeat get_filter calls within the TTL query the database once"""
+        mock_session_local.return_value.execute.return_value.fetchone.return_value = ({"states": ["Texas"]},)
+
+        manager = FilterManager()
+        first = manager.get_filter()
+        second = manager.get_filter()
+
+        assert first.states == second.states == ["Texas"]
+        mock_session_local.assert_called_once()
+
+    @patch.object(FilterManager, "_get_user_id", return_value="test_user")
+    @patch("src.database.engine.SessionLocal")
+    def test_get_filter_returns_copy(self, mock_session_local, mock_get_user_id):
+        """Test mutating a returned filter leaves the cached filter untouched"""
+        mock_session_local.return_value.execute.return_value.fetchone.return_value = ({"states": ["Texas"]},)
+
+        manager = FilterManager()
+        manager.get_filter().states.append("Ohio")
+
+        assert manager.get_filter().states == ["Texas"]
+
+    @patch.object(FilterManager, "_get_user_id", return_value="test_user")
+    @patch("src.database.engine.SessionLocal")
+    def test_get_filter_cache_expires(self, mock_session_local, mock_get_user_id):
+        """Test the cached filter is reloaded once FILTER_CACHE_TTL_SECONDS has passed"""
+        mock_session_local.return_value.execute.return_value.fetchone.return_value = None
+
+        manager = FilterManager()
+        with patch("src.core.filter_manager.time.monotonic", return_value=1000.0):
+            manager.get_filter()
+        with patch(
+            "src.core.filter_manager.time.monotonic", return_value=1000.0 + FilterManager.FILTER_CACHE_TTL_SECONDS
+        ):
+            manager.get_filter()
+
+        assert mock_session_local.call_count == 2
+
+    @patch.object(FilterManager, "_get_user_id", return_value="test_user")
+    @patch("src.database.engine.SessionLocal")
+    def test_invalidate_filter_cache(self, mock_session_local, mock_get_user_id):
+        """Test invalidate_filter_cache forces the next get_filter to hit the database"""
+        mock_session_local.return_value.execute.return_value.fetchone.return_value = None
+
+        manager = FilterManager()
+        manager.get_filter()
+        manager.invalidate_filter_cache("test_user")
+        manager.get_filter()
+        manager.invalidate_filter_cache()
+        manager.get_filter()
+
+        assert mock_session_local.call_count == 3
+
 
 class TestFilterManagerSetMethods:
     """Test FilterManager set methods"""
@@ -486,6 +608,30 @@ class TestFilterManagerSaveFilter:
         # Should not raise exception
         manager._save_filter(filter_obj)
 
+    @patch.object(FilterManager, "_get_user_id", return_value="test_user")
+    @patch("src.database.engine.SessionLocal")
+    def test_save_filter_refreshes_cache(self, mock_session_local, mock_get_user_id):
+        """Test a saved filter is served from the cache without reloading"""
+        manager = FilterManager()
+        manager._save_filter(DataFilter(states=["Ohio"], fiscal_years=[2020]))
+
+        filter_obj = manager.get_filter()
+
+        assert filter_obj.states == ["Ohio"]
+        assert filter_obj.fiscal_years == [2020]
+        mock_session_local.assert_called_once()
+
+    @patch.object(FilterManager, "_get_user_id", return_value="test_user")
+    @patch("src.database.engine.SessionLocal", side_effect=Exception("DB error"))
+    def test_save_filter_database_error_invalidates_cache(self, mock_session_local, mock_get_user_id):
+        """Test a failed save drops the user's cached filter"""
+        manager = FilterManager()
+        manager._cache_filter("test_user", DataFilter(states=["Ohio"]))
+
+        manager._save_filter(DataFilter(states=["Nevada"]))
+
+        assert "test_user" not in manager._filter_cache
+
 
 class TestFilterManagerApplyToSQL:
     """Test FilterManager apply_to_sql method"""
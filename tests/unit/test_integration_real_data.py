@@ -4,10 +4,14 @@ Integration test with real SNAP QC data
 Tests the complete ETL pipeline with the actual test.csv file (43,777 rows)
 """
 
+import pytest
+
 from src.etl.reader import CSVReader
 from src.etl.transformer import DataTransformer
 from src.etl.validator import DataValidator
 
+pytestmark = pytest.mark.slow
+
 
 class TestRealDataETL:
     """Integration tests with real SNAP QC data"""
@@ -8,6 +8,7 @@ AI-generated responses (query results with summaries) use AI_PERSONA.
 System messages (errors, status) use APP_PERSONA via send_message.
 """
 
+import asyncio
 import contextlib
 import uuid
 from datetime import datetime
@@ -195,9 +196,6 @@ async def _display_query_results(query_response: dict, sql: str, question: str,
         question: Original user question
         explanation: Explanation from query generator
     """
-    # Format and display results
-    results_html = format_sql_results(query_response["results"], query_response.get("row_count", 0))
-
     # Store results in session for CSV download (capped to limit memory; full export via API)
     results_data = query_response["results"]
     cl.user_session.set("last_query_results", results_data[:MAX_SESSION_RESULT_ROWS])
@@ -244,14 +242,18 @@ async def _display_query_results(query_response: dict, sql: str, question: str,
     row_count = query_response.get("row_count", 0)
     user_id = cl.user_session.get("user_id") or "system"
 
-    ai_summary = await generate_ai_summary(
-        question=question,
-        sql=sql,
-        results=query_response["results"],
-        row_count=row_count,
-        filters=filters_desc,
-        llm_params=summary_llm_params,
-        user_id=user_id,
+    # Render the results table in a worker thread while the AI summary is generated
+    results_html, ai_summary = await asyncio.gather(
+        asyncio.to_thread(format_sql_results, query_response["results"], row_count),
+        generate_ai_summary(
+            question=question,
+            sql=sql,
+            results=query_response["results"],
+            row_count=row_count,
+            filters=filters_desc,
+            llm_params=summary_llm_params,
+            user_id=user_id,
+        ),
     )
 
     # Always generate the template summary as a footer line
@@ -502,12 +504,12 @@ async def _handle_insight_streaming(question: str, user_id: str, scope: str, inc
         all_queries = thread_ctx.get_queries_for_insight()  # All queries, newest first
 
         if all_queries:
-            import json
+            import orjson
 
             from src.core.config import settings
 
             # Dynamic budget: use context_window to determine how much thread data to send
-            # Estimate: 1 token ≈ 4 chars. Reserve space for system prompt, KB docs, and response.
+            # Estimate: 1 token ≈ 4 bytes of JSON. Reserve space for system prompt, KB docs, and response.
             context_window = (llm_params or {}).get("context_window") or 0
             max_response_tokens = (llm_params or {}).get("max_tokens") or settings.llm_kb_max_tokens
 
@@ -543,12 +545,13 @@ async def _handle_insight_streaming(question: str, user_id: str, scope: str, inc
                     "timestamp": query.timestamp,
                 }
 
-                query_size = len(json.dumps(query_data))
+                # orjson: compact UTF-8 JSON in one C pass; size is measured in bytes
+                query_size = len(orjson.dumps(query_data, default=str))
 
                 if current_size + query_size > max_context_size:
                     # Try with fewer rows before giving up
                     query_data["results"] = query.results[:3] if query.results else []
-                    query_size = len(json.dumps(query_data))
+                    query_size = len(orjson.dumps(query_data, default=str))
                     if current_size + query_size > max_context_size:
                         break
 
@@ -556,12 +559,13 @@ async def _handle_insight_streaming(question: str, user_id: str, scope: str, inc
                 current_size += query_size
 
             logger.info(
-                f"Thread context: {len(thread_data)} queries, {current_size} chars (budget: {max_context_size}, rows/query: {max_sample_rows})"
+                f"Thread context: {len(thread_data)} queries, {current_size} bytes (budget: {max_context_size}, rows/query: {max_sample_rows})"
             )
 
-            data_context = json.dumps(
-                {"thread_queries": thread_data, "total_queries": len(thread_data), "context_size_chars": current_size}
-            )
+            data_context = orjson.dumps(
+                {"thread_queries": thread_data, "total_queries": len(thread_data), "context_size_bytes": current_size},
+                default=str,
+            ).decode()
 
     stream = None
     try: